@@ -0,0 +1,204 @@
+"""
+Append-only binary archive of scored assessments with fixed-width records.
+
+Each record stores the child id, birth and survey dates as day ordinals, the
+gestational age in weeks, the corrected age in hundredths of a year and one
+code per pauta (not evaluated / passed / failed / not answered / skipped).
+Fixed-width records make random access by index O(1), and the file can be
+read as a zero-copy NumPy structured array with ArchiveReader.as_numpy().
+"""
+
+import mmap
+import os
+import struct
+from datetime import date
+from decimal import Decimal
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Tuple
+
+from .fixedpoint import from_hundredths, to_hundredths
+from .percetiles import MAX_PAUTA_ID, check_pauta_ids
+from .scoring import AssessmentResult
+
+# Código por pauta
+NOT_EVALUATED = 0
+PASSED = 1
+FAILED = 2
+NOT_ANSWERED = 3
+SKIPPED = 4  # Answered, but not read once the verdict was decided
+
+ARCHIVE_MAGIC = b"PRNARCH1"
+ARCHIVE_VERSION = 1
+_HEADER = struct.Struct("<8sHHI")  # magic, version, pautas, record size
+_RECORD = struct.Struct(f"<QIIBh{MAX_PAUTA_ID}s")
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = _RECORD.size
+
+# Equivalent NumPy dtype, as (name, format, shape) fields without padding
+NUMPY_FIELDS = (
+    ("child_id", "<u8", ()),
+    ("birth_date", "<u4", ()),
+    ("survey_date", "<u4", ()),
+    ("gestational_age_weeks", "u1", ()),
+    ("corrected_age", "<i2", ()),
+    ("codes", "u1", (MAX_PAUTA_ID,)),
+)
+
+
+class ArchivedAssessment(NamedTuple):
+    child_id: int
+    birth_date: date
+    survey_date: date
+    gestational_age_weeks: int
+    corrected_age: Decimal
+    codes: bytes  # codes[pauta_id - 1]
+
+    def code(self, pauta_id: int) -> int:
+        return self.codes[pauta_id - 1]
+
+
+def encode_codes(result: AssessmentResult) -> bytes:
+    """
+    Per-pauta codes of a scored assessment.
+
+    Raises:
+        ValueError: If a pauta id is above MAX_PAUTA_ID
+    """
+    check_pauta_ids(result.evaluated + result.missing + result.skipped)
+    codes = bytearray(MAX_PAUTA_ID)
+    for pauta_id in result.missing:
+        codes[pauta_id - 1] = NOT_ANSWERED
+    for pauta_id in result.skipped:
+        codes[pauta_id - 1] = SKIPPED
+    for pauta_id in result.passed:
+        codes[pauta_id - 1] = PASSED
+    for pauta_id in result.failed:
+        codes[pauta_id - 1] = FAILED
+    return bytes(codes)
+
+
+def _check_header(header: bytes, path: str):
+    magic, version, pautas, record_size = _HEADER.unpack(header)
+    if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+        raise ValueError(f"{path} is not a version {ARCHIVE_VERSION} archive")
+    if (pautas, record_size) != (MAX_PAUTA_ID, RECORD_SIZE):
+        raise ValueError(f"{path} has an incompatible record layout")
+
+
+class ArchiveWriter:
+    """Appends records to an archive, creating it with a header if needed"""
+
+    def __init__(self, path: str):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file: BinaryIO = open(path, "r+b" if exists else "wb")
+        if exists:
+            _check_header(self._file.read(HEADER_SIZE), path)
+            size = self._file.seek(0, os.SEEK_END)
+            if (size - HEADER_SIZE) % RECORD_SIZE:
+                raise ValueError(f"{path} ends with a partial record")
+        else:
+            self._file.write(
+                _HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, MAX_PAUTA_ID, RECORD_SIZE)
+            )
+
+    def append(
+        self,
+        child_id: int,
+        birth_date: date,
+        survey_date: date,
+        gestational_age_weeks: int,
+        result: AssessmentResult,
+    ):
+        """Append one scored assessment"""
+        self._file.write(
+            _RECORD.pack(
+                child_id,
+                birth_date.toordinal(),
+                survey_date.toordinal(),
+                gestational_age_weeks,
+                to_hundredths(result.corrected_age),
+                encode_codes(result),
+            )
+        )
+
+    def append_many(
+        self, records: Iterable[Tuple[int, date, date, int, AssessmentResult]]
+    ) -> int:
+        """Append (child_id, birth_date, survey_date, weeks, result) tuples"""
+        count = 0
+        for record in records:
+            self.append(*record)
+            count += 1
+        return count
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveReader:
+    """Memory-mapped, read-only access to an archive"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as archive:
+            _check_header(archive.read(HEADER_SIZE), path)
+            size = archive.seek(0, os.SEEK_END)
+            self._count = (size - HEADER_SIZE) // RECORD_SIZE
+            self._map = (
+                mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._count
+                else None
+            )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> ArchivedAssessment:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("archive index out of range")
+        child_id, birth, survey, weeks, age, codes = _RECORD.unpack_from(
+            self._map, HEADER_SIZE + index * RECORD_SIZE
+        )
+        return ArchivedAssessment(
+            child_id,
+            date.fromordinal(birth),
+            date.fromordinal(survey),
+            weeks,
+            from_hundredths(age),
+            codes,
+        )
+
+    def __iter__(self) -> Iterator[ArchivedAssessment]:
+        for index in range(self._count):
+            yield self[index]
+
+    def as_numpy(self):
+        """
+        The records as a read-only numpy.memmap structured array (requires NumPy).
+        """
+        try:
+            import numpy
+        except ImportError as error:
+            raise ImportError("ArchiveReader.as_numpy requires NumPy") from error
+        dtype = numpy.dtype([(name, fmt, shape) for name, fmt, shape in NUMPY_FIELDS])
+        return numpy.memmap(
+            self.path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(self._count,)
+        )
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
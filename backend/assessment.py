@@ -1,82 +1,140 @@
+import argparse
+import sys
 from datetime import date
-from decimal import Decimal
-from child import Child
-from percetiles import PautasRepository
+from typing import List, Optional
 
+from .child import Child
+from .formatting import format_age, format_date, format_decimal
+from .instrumentation import stage
+from .scoring import TrialCount, build_plan
+from .verdict import VerdictEngine
 
-def run_assessment():
-    """Ejemplo de evaluación con corrección de edad por prematurez"""
 
-    # Crear el repositorio de pautas
-    repo = PautasRepository()
+def run_assessment(stop_early: bool = False):
+    """
+    Ejemplo de evaluación con corrección de edad por prematurez
+
+    Args:
+        stop_early: Administer A pautas first, then B, and stop asking once
+            the PRUNAPE verdict is decided
+    """
 
     # Datos del caso de ejemplo
     birth_date = date(2016, 1, 18)
     survey_date = date(2019, 5, 16)
     gestational_age = 38  # semanas
 
-    # Crear el niño
+    # Crear el niño y armar el plan de evaluación con el repositorio compartido
     child = Child(birth_date, survey_date, gestational_age)
-
-    # Mostrar información de edad
-    print(f"Fecha de nacimiento: {birth_date.strftime('%d/%m/%Y')}")
-    print(f"Fecha de evaluación: {survey_date.strftime('%d/%m/%Y')}")
-    print(f"Edad gestacional: {gestational_age} semanas")
-    print(f"Edad cronológica: {child.calculate_age()} años")
-    print(f"Edad corregida: {child.calculate_corrected_age()} años")
-    print("-" * 50)
-
-    # Obtener todas las pautas apropiadas para la edad del niño
-    age_to_use = child.calculate_corrected_age()
-    suitable_pautas = []
-
-    for pauta in repo.pautas:
-        if pauta.should_evaluate(age_to_use):
-            suitable_pautas.append(pauta)
-
-    # Asegurar que hay pautas de cada área del desarrollo
-    areas_covered = set(pauta.area.name for pauta in suitable_pautas)
-    print(f"Áreas cubiertas en la evaluación: {areas_covered}")
-    print(f"Total de pautas a evaluar: {len(suitable_pautas)}")
-
-    # Usar las pautas seleccionadas en lugar de IDs hardcodeados
-    print("Resultados de la evaluación:")
-    print("-" * 50)
-
-    for pauta in suitable_pautas:
-        is_a = pauta.is_pauta_a(age_to_use)
-        is_b = pauta.is_pauta_b(age_to_use)
-
-        result = "Normal"
-        if is_a:
-            result = "Por encima de P90 (desarrollo avanzado)"
-        elif is_b:
-            result = "Entre P75-P90 (desarrollo superior al promedio)"
-
-        print(f"Pauta {pauta.id}: {pauta.name} ({pauta.area}) - {result}")
-        print(f"  P75: {pauta.p75}, P90: {pauta.p90}, Edad corregida: {age_to_use}")
-        print()
-
-    # Diccionario para almacenar resultados (pasa/falla) para cada pauta
-    resultados = {}
-
-    # En un caso real permitiríamos al evaluador ingresar los resultados
-    print("\nIngrese resultados para cada pauta (S=Pasa, N=Falla):")
-    for pauta in suitable_pautas:
-        while True:
-            print(f"Pauta {pauta.id}: {pauta.name} ({pauta.tipo_pauta})")
-            respuesta = input("¿Pasa esta prueba? (S/N): ").strip().upper()
-            if respuesta in ["S", "N"]:
-                resultados[pauta.id] = respuesta == "S"
+    with stage("assessment.plan"):
+        plan = build_plan(child)
+
+    with stage("assessment.output"):
+        # Mostrar información de edad
+        print(f"Fecha de nacimiento: {format_date(birth_date)}")
+        print(f"Fecha de evaluación: {format_date(survey_date)}")
+        print(f"Edad gestacional: {gestational_age} semanas")
+        print(f"Edad cronológica: {format_age(plan.chronological_age)}")
+        print(f"Edad corregida: {format_age(plan.corrected_age)}")
+        print("-" * 50)
+
+        # Asegurar que hay pautas de cada área del desarrollo
+        areas_covered = set(item.pauta.area.name for item in plan.items)
+        print(f"Áreas cubiertas en la evaluación: {areas_covered}")
+        print(f"Total de pautas a evaluar: {len(plan.items)}")
+
+        print("Resultados de la evaluación:")
+        print("-" * 50)
+
+        for pauta, is_a, is_b in plan.items:
+            result = "Normal"
+            if is_a:
+                result = "Por encima de P90 (desarrollo avanzado)"
+            elif is_b:
+                result = "Entre P75-P90 (desarrollo superior al promedio)"
+
+            print(f"Pauta {pauta.id}: {pauta.name} ({pauta.area}) - {result}")
+            print(
+                f"  P75: {format_decimal(pauta.p75)}, P90: {format_decimal(pauta.p90)},"
+                f" Edad corregida: {format_decimal(plan.corrected_age)}"
+            )
+            print()
+
+    with stage("assessment.answers"):
+        # El motor lleva el veredicto a medida que se registran los resultados
+        # (pasa/falla); con stop_early se evalúan las pautas A primero, luego
+        # las B, y se deja de preguntar cuando el resultado ya está decidido
+        engine = VerdictEngine(plan)
+        resultados = engine.answers
+        items = engine.order if stop_early else plan.items
+
+        # En un caso real permitiríamos al evaluador ingresar los resultados
+        print("\nIngrese resultados para cada pauta (S=Pasa, N=Falla):")
+        for item in items:
+            if stop_early and engine.is_decided:
+                print("El resultado PRUNAPE ya está decidido; no hace falta evaluar más pautas.")
                 break
-            print("Por favor, ingrese S o N.")
-
-    # Mostrar resultados finales
-    print("\nResultados finales:")
-    for pauta_id, pasa in resultados.items():
-        resultado = "Pasa" if pasa else "Falla"
-        print(f"Pauta {pauta_id}: {resultado}")
+            pauta = item.pauta
+            trials = pauta.approval.trials
+            while True:
+                print(f"Pauta {pauta.id}: {pauta.name} ({pauta.tipo_pauta})")
+                if trials > 1:
+                    # Pautas con rango de aprobación: se registran los intentos logrados
+                    respuesta = input(
+                        f"¿Cuántos intentos logró de {trials}?"
+                        f" (aprueba con {pauta.approval.required}): "
+                    ).strip()
+                    if respuesta.isdigit() and int(respuesta) <= trials:
+                        engine.record(pauta.id, TrialCount(int(respuesta), trials))
+                        break
+                    print(f"Por favor, ingrese un número entre 0 y {trials}.")
+                    continue
+                respuesta = input("¿Pasa esta prueba? (S/N): ").strip().upper()
+                if respuesta in ["S", "N"]:
+                    engine.record(pauta.id, respuesta == "S")
+                    break
+                print("Por favor, ingrese S o N.")
+
+    with stage("assessment.score"):
+        result = engine.result()
+
+    with stage("assessment.output"):
+        # Mostrar resultados finales
+        print("\nResultados finales:")
+        for item in plan.items:
+            pauta_id = item.pauta.id
+            if pauta_id not in resultados:
+                continue
+            respuesta = resultados[pauta_id]
+            resultado = "Pasa" if pauta_id in result.passed else "Falla"
+            if isinstance(respuesta, TrialCount):
+                logrados, intentos = respuesta
+                resultado += f" ({logrados} de {intentos} intentos logrados)"
+            print(f"Pauta {pauta_id}: {resultado}")
+
+        print("\nResumen por área:")
+        for summary in result.areas:
+            if summary.evaluated:
+                print(
+                    f"{summary.area}: {summary.passed} pasa, {summary.failed} falla"
+                    f" de {summary.evaluated}"
+                )
+        print(f"Pautas A falladas: {list(result.failed_a)}")
+        print(f"Pautas B falladas: {list(result.failed_b)}")
+        print(f"Resultado PRUNAPE: {'Pasa' if result.passed_screening else 'No pasa'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluación PRUNAPE de ejemplo")
+    parser.add_argument(
+        "--stop-early",
+        action="store_true",
+        help="dejar de preguntar cuando el resultado PRUNAPE ya está decidido",
+    )
+    args = parser.parse_args(argv)
+    run_assessment(stop_early=args.stop_early)
+    return 0
 
 
 if __name__ == "__main__":
-    run_assessment()
+    sys.exit(main())
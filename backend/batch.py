@@ -0,0 +1,240 @@
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from .percetiles import PautasRepository, region_index
+from .registry import get_active_repository
+
+# Cantidad de intentos logrados para una pauta sin respuesta en la matriz
+NOT_ANSWERED = 0xFF
+
+# Tablas de traducción por pauta: aprobada, fallada e inválida
+_TrialTables = Tuple[List[bytes], List[bytes], List[bytes]]
+
+
+class _ClassificationIndex:
+    """
+    Precomputed evaluate / category A / category B rows for a repository.
+
+    Every p75, p90 and evaluation window endpoint is a boundary. In each
+    region of percetiles.region_index, between two consecutive boundaries or
+    on a boundary itself, all three flags are constant for every pauta, so
+    each region stores its three rows once, computed with the scalar Pauta
+    methods on a representative age.
+    """
+
+    __slots__ = ("boundaries", "evaluate", "category_a", "category_b")
+
+    def __init__(self, repo: PautasRepository):
+        boundaries = set()
+        for pauta in repo.pautas:
+            boundaries.update((pauta.p75, pauta.p90))
+        boundaries.update(repo.plan_boundaries)
+        self.boundaries: List[Decimal] = sorted(boundaries)
+
+        # Una edad por región, en el orden de region_index
+        representatives: List[Decimal] = []
+        previous = None
+        for boundary in self.boundaries:
+            if previous is None:
+                representatives.append(boundary - 1)
+            else:
+                representatives.append((previous + boundary) / 2)
+            representatives.append(boundary)
+            previous = boundary
+        representatives.append(previous + 1 if previous is not None else Decimal(0))
+
+        self.evaluate: List[bytes] = []
+        self.category_a: List[bytes] = []
+        self.category_b: List[bytes] = []
+        for age in representatives:
+            self.evaluate.append(
+                bytes(pauta.should_evaluate(age) for pauta in repo.pautas)
+            )
+            self.category_a.append(
+                bytes(pauta.is_pauta_a(age) for pauta in repo.pautas)
+            )
+            self.category_b.append(
+                bytes(pauta.is_pauta_b(age) for pauta in repo.pautas)
+            )
+
+    def region(self, age: Decimal) -> int:
+        """Return the region index for an age"""
+        return region_index(self.boundaries, age)
+
+
+def _trial_tables(repo: PautasRepository) -> _TrialTables:
+    """
+    Per-pauta 256-byte translation tables from a success count to the
+    passed, failed and invalid flags, in repository order. NOT_ANSWERED
+    maps to 0 in all three.
+    """
+    passed_tables = []
+    failed_tables = []
+    invalid_tables = []
+    for required, trials in zip(repo.columns.required, repo.columns.trials):
+        counts = range(256)
+        passed_tables.append(
+            bytes(required <= count <= trials for count in counts)
+        )
+        failed_tables.append(bytes(count < required for count in counts))
+        invalid_tables.append(
+            bytes(trials < count < NOT_ANSWERED for count in counts)
+        )
+    return passed_tables, failed_tables, invalid_tables
+
+
+_indexes: "WeakKeyDictionary[PautasRepository, _ClassificationIndex]" = (
+    WeakKeyDictionary()
+)
+
+
+def _index_for(repo: PautasRepository) -> _ClassificationIndex:
+    index = _indexes.get(repo)
+    if index is None:
+        index = _indexes[repo] = _ClassificationIndex(repo)
+    return index
+
+
+_trial_table_cache: "WeakKeyDictionary[PautasRepository, _TrialTables]" = (
+    WeakKeyDictionary()
+)
+
+
+def _trial_tables_for(repo: PautasRepository) -> _TrialTables:
+    tables = _trial_table_cache.get(repo)
+    if tables is None:
+        tables = _trial_table_cache[repo] = _trial_tables(repo)
+    return tables
+
+
+class BatchClassification:
+    """
+    Result of classifying N ages against all pautas of a repository.
+
+    Each matrix is N x len(pauta_ids) uint8 values (1 = True, 0 = False) in
+    row-major order, one row per age and one column per pauta in repository
+    order. They can be wrapped without copying, e.g.
+    numpy.frombuffer(result.evaluate, dtype=numpy.uint8).reshape(result.shape).
+    """
+
+    __slots__ = ("pauta_ids", "evaluate", "category_a", "category_b")
+
+    def __init__(
+        self,
+        pauta_ids: Tuple[int, ...],
+        evaluate: bytes,
+        category_a: bytes,
+        category_b: bytes,
+    ):
+        self.pauta_ids = pauta_ids
+        self.evaluate = evaluate
+        self.category_a = category_a
+        self.category_b = category_b
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        columns = len(self.pauta_ids)
+        return (len(self.evaluate) // columns if columns else 0, columns)
+
+    def row(self, matrix: bytes, index: int) -> bytes:
+        """Return the row of a matrix for the age at the given index"""
+        columns = len(self.pauta_ids)
+        return matrix[index * columns : (index + 1) * columns]
+
+
+def classify_ages(
+    ages: Iterable[Decimal], repo: Optional[PautasRepository] = None
+) -> BatchClassification:
+    """
+    Classify many ages against every pauta at once.
+
+    Gives the same results as calling Pauta.should_evaluate, is_pauta_a and
+    is_pauta_b for every (age, pauta) pair, but each age costs a single
+    bisect over the precomputed regions.
+
+    Args:
+        ages: Corrected ages in decimal years
+        repo: Repository to classify against (defaults to the active norm set)
+
+    Returns:
+        The evaluate / category A / category B matrices
+    """
+    repo = repo or get_active_repository()
+    index = _index_for(repo)
+    regions = [index.region(age) for age in ages]
+    return BatchClassification(
+        tuple(pauta.id for pauta in repo.pautas),
+        b"".join([index.evaluate[region] for region in regions]),
+        b"".join([index.category_a[region] for region in regions]),
+        b"".join([index.category_b[region] for region in regions]),
+    )
+
+
+class TrialOutcomes:
+    """
+    Result of scoring an N x len(pauta_ids) matrix of successful trial counts.
+
+    passed and failed are uint8 matrices (1 = True, 0 = False) laid out like
+    the BatchClassification matrices; a pauta without an answer is 0 in both.
+    """
+
+    __slots__ = ("pauta_ids", "passed", "failed")
+
+    def __init__(self, pauta_ids: Tuple[int, ...], passed: bytes, failed: bytes):
+        self.pauta_ids = pauta_ids
+        self.passed = passed
+        self.failed = failed
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        columns = len(self.pauta_ids)
+        return (len(self.passed) // columns if columns else 0, columns)
+
+    def row(self, matrix: bytes, index: int) -> bytes:
+        """Return the row of a matrix for the record at the given index"""
+        columns = len(self.pauta_ids)
+        return matrix[index * columns : (index + 1) * columns]
+
+
+def score_trials(
+    counts: bytes, repo: Optional[PautasRepository] = None
+) -> TrialOutcomes:
+    """
+    Apply the approval range of every pauta to many records at once.
+
+    counts is a row-major uint8 matrix with one row per record and one
+    column per pauta in repository order, holding the successful trials
+    (0/1 for single-trial pautas) or NOT_ANSWERED. Each column is scored
+    with a single bytes.translate over a precomputed table, so the ranges
+    are never re-parsed per record.
+
+    Args:
+        counts: Successful trial counts, len(repo.pautas) bytes per record
+        repo: Repository to score against (defaults to the active norm set)
+
+    Raises:
+        ValueError: If the matrix does not have whole rows or a count
+            exceeds the trials of its pauta
+    """
+    repo = repo or get_active_repository()
+    columns = len(repo.pautas)
+    if columns == 0 or len(counts) % columns:
+        raise ValueError(
+            f"Trial matrix length {len(counts)} is not a multiple of {columns}"
+        )
+    passed_tables, failed_tables, invalid_tables = _trial_tables_for(repo)
+    passed = bytearray(len(counts))
+    failed = bytearray(len(counts))
+    for column in range(columns):
+        values = counts[column::columns]
+        if 1 in values.translate(invalid_tables[column]):
+            raise ValueError(
+                f"Trial count above {repo.columns.trials[column]} for pauta"
+                f" {repo.columns.ids[column]}"
+            )
+        passed[column::columns] = values.translate(passed_tables[column])
+        failed[column::columns] = values.translate(failed_tables[column])
+    return TrialOutcomes(
+        tuple(pauta.id for pauta in repo.pautas), bytes(passed), bytes(failed)
+    )
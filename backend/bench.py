@@ -0,0 +1,275 @@
+"""
+Benchmarks for the backend hot paths on synthetic cohorts.
+
+Each benchmark reports throughput, per-operation latency percentiles and the
+peak RSS of the process, results can be saved as JSON and compared against
+a stored baseline to catch regressions.
+
+Every benchmark runs in a fresh process by default, so its peak RSS is its
+own. With --in-process they all share this process and the RSS column is the
+cumulative high-water mark of the whole run.
+
+Usage:
+    python -m backend.bench [--sizes 1000 100000 1000000] [--output bench.json]
+                            [--baseline baseline.json] [--tolerance 0.15]
+                            [--in-process]
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .batch import classify_ages
+from .child import Child, calculate_cohort_ages
+from .instrumentation import percentile
+from .percetiles import PautasRepository, get_shared_repository
+from .scoring import build_plan
+
+COHORT_SIZES = (1_000, 100_000, 1_000_000)
+LATENCY_SAMPLE = 10_000
+REPOSITORY_BUILDS = 50
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_SEED = 20190516
+
+
+class Cohort(NamedTuple):
+    birth_dates: List[date]
+    survey_dates: List[date]
+    gestational_ages_weeks: List[int]
+
+    def children(self) -> List[Child]:
+        return [
+            Child(birth_date, survey_date, weeks)
+            for birth_date, survey_date, weeks in zip(
+                self.birth_dates, self.survey_dates, self.gestational_ages_weeks
+            )
+        ]
+
+
+def synthetic_cohort(size: int, seed: int = DEFAULT_SEED) -> Cohort:
+    """Children from 0 to about 6.5 years old, 10% of them preterm"""
+    rng = random.Random(seed)
+    birth_dates = []
+    survey_dates = []
+    weeks = []
+    for _ in range(size):
+        birth_date = date(2015, 1, 1) + timedelta(days=rng.randint(0, 1500))
+        birth_dates.append(birth_date)
+        survey_dates.append(birth_date + timedelta(days=rng.randint(10, 2400)))
+        weeks.append(rng.randint(26, 36) if rng.random() < 0.1 else rng.randint(37, 41))
+    return Cohort(birth_dates, survey_dates, weeks)
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KB (Linux reports KB, macOS bytes)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(operation: Callable[[object], object], items: Sequence) -> Dict[str, float]:
+    """
+    Warm up on a sample of the items, time the whole loop for throughput,
+    then time a sample of single calls for latency percentiles.
+    """
+    for item in items[:LATENCY_SAMPLE]:
+        operation(item)
+
+    started = time.perf_counter()
+    for item in items:
+        operation(item)
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    for item in items[:LATENCY_SAMPLE]:
+        call_started = time.perf_counter()
+        operation(item)
+        latencies.append(time.perf_counter() - call_started)
+    latencies.sort()
+    return {
+        "ops": len(items),
+        "seconds": elapsed,
+        "ops_per_sec": len(items) / elapsed if elapsed else 0.0,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def _bench_repository(cohort: Cohort) -> Dict[str, float]:
+    return measure(lambda _: PautasRepository(), range(REPOSITORY_BUILDS))
+
+
+def _bench_should_evaluate(cohort: Cohort) -> Dict[str, float]:
+    pautas = get_shared_repository().pautas
+    ages = [child.calculate_corrected_age() for child in cohort.children()]
+    return measure(lambda age: [p for p in pautas if p.should_evaluate(age)], ages)
+
+
+def _bench_corrected_age(cohort: Cohort) -> Dict[str, float]:
+    return measure(Child.calculate_corrected_age, cohort.children())
+
+
+def _bench_build_plan(cohort: Cohort) -> Dict[str, float]:
+    repo = get_shared_repository()
+    return measure(lambda child: build_plan(child, repo), cohort.children())
+
+
+def _bench_cohort_ages(cohort: Cohort) -> Dict[str, float]:
+    result = measure(lambda c: calculate_cohort_ages(*c), [cohort])
+    result["ops"] = len(cohort.birth_dates)
+    result["ops_per_sec"] = result["ops"] / result["seconds"] if result["seconds"] else 0.0
+    return result
+
+
+def _bench_classify_ages(cohort: Cohort) -> Dict[str, float]:
+    repo = get_shared_repository()
+    ages = [child.calculate_corrected_age() for child in cohort.children()]
+    result = measure(lambda a: classify_ages(a, repo), [ages])
+    result["ops"] = len(ages)
+    result["ops_per_sec"] = result["ops"] / result["seconds"] if result["seconds"] else 0.0
+    return result
+
+
+BENCHMARKS: Dict[str, Callable[[Cohort], Dict[str, float]]] = {
+    "repository_construction": _bench_repository,
+    "should_evaluate": _bench_should_evaluate,
+    "corrected_age": _bench_corrected_age,
+    "build_plan": _bench_build_plan,
+    "cohort_ages": _bench_cohort_ages,
+    "classify_ages": _bench_classify_ages,
+}
+
+
+def _run_isolated(name: str, size: int, seed: int) -> Dict[str, float]:
+    """Run one benchmark in a worker process of its own"""
+    get_shared_repository()  # Keep the one-off warm-up out of the measurements
+    return BENCHMARKS[name](synthetic_cohort(size, seed))
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = COHORT_SIZES,
+    names: Optional[Sequence[str]] = None,
+    seed: int = DEFAULT_SEED,
+    isolate: bool = True,
+) -> Dict:
+    """
+    Run the selected benchmarks for each cohort size.
+
+    Args:
+        sizes: Cohort sizes to run every benchmark with
+        names: Benchmarks to run (defaults to all of them)
+        seed: Seed of the synthetic cohorts
+        isolate: Run each benchmark in a fresh process so its peak RSS is its
+            own; otherwise the reported RSS is cumulative over the run
+    """
+    selected = [
+        (name, size)
+        for size in sizes
+        for name in names or BENCHMARKS
+        # Repository construction does not depend on the cohort size
+        if name != "repository_construction" or size == sizes[0]
+    ]
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    if isolate:
+        # Un proceso nuevo por benchmark: el pico de RSS no arrastra los anteriores
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            for name, size in selected:
+                results.setdefault(name, {})[str(size)] = pool.apply(
+                    _run_isolated, (name, size, seed)
+                )
+    else:
+        get_shared_repository()
+        cohorts: Dict[int, Cohort] = {}
+        for name, size in selected:
+            if size not in cohorts:
+                cohorts.clear()
+                cohorts[size] = synthetic_cohort(size, seed)
+            results.setdefault(name, {})[str(size)] = BENCHMARKS[name](cohorts[size])
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "rss": "per_benchmark" if isolate else "cumulative",
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compare throughput with a baseline run.
+
+    Returns:
+        A description of every benchmark slower than the baseline by more than tolerance
+    """
+    regressions = []
+    for name, by_size in current["results"].items():
+        for size, result in by_size.items():
+            reference = baseline.get("results", {}).get(name, {}).get(size)
+            if not reference or not reference["ops_per_sec"]:
+                continue
+            ratio = result["ops_per_sec"] / reference["ops_per_sec"]
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{name}[{size}]: {result['ops_per_sec']:.0f} ops/s vs "
+                    f"{reference['ops_per_sec']:.0f} baseline ({ratio:.0%})"
+                )
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    # Los reportes sin el campo "rss" se corrieron en un solo proceso
+    rss = "rss MB" if report.get("rss") == "per_benchmark" else "cum. rss MB"
+    lines = [
+        f"{'benchmark':<24} {'size':>8} {'ops/s':>12} {'p50 us':>9} {'p99 us':>9} "
+        f"{rss:>11}"
+    ]
+    for name, by_size in report["results"].items():
+        for size, result in by_size.items():
+            lines.append(
+                f"{name:<24} {size:>8} {result['ops_per_sec']:>12.0f} "
+                f"{result['p50_us']:>9.1f} {result['p99_us']:>9.1f} "
+                f"{result['peak_rss_kb'] / 1024:>11.1f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del backend PRUNAPE")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(COHORT_SIZES))
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="guardar los resultados en este JSON")
+    parser.add_argument("--baseline", help="comparar contra este JSON de referencia")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="correr todo en este proceso (el RSS reportado es acumulado)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.only, args.seed, not args.in_process)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
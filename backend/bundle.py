@@ -0,0 +1,369 @@
+"""
+Precompiled plan bundle for the Android client, with binary delta updates.
+
+A bundle holds the norm table and the screening plan of every 0.01-year age
+bucket in one little-endian file the app can memory-map, so the device looks
+plans up instead of repeating the should_evaluate / A / B checks:
+
+    header     magic, format version, counts, section offsets, norm version
+    pautas     one record per pauta: id, area, tipo, p75, p90 (hundredths),
+               required successes and trials of its approval range
+    plans      distinct plans, each as three 16-byte pauta masks: evaluate,
+               category A and category B (bit pauta_id - 1, little-endian)
+    buckets    one uint16 plan index per age bucket from start_age on;
+               ages outside the buckets have an empty plan
+    names      uint32 end offsets followed by the UTF-8 pauta names
+
+Norm updates ship as deltas: zlib-compressed copy/insert instructions that
+rebuild the new bundle from the one already on the device, checked against
+both hashes.
+
+Usage:
+    python -m backend.bundle export bundle.bin [--norms norms.csv]
+    python -m backend.bundle diff old.bin new.bin update.delta
+    python -m backend.bundle apply old.bin update.delta new.bin
+"""
+
+import argparse
+import hashlib
+import struct
+import sys
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .pautaset import SET_SIZE, PautaSet
+from .percetiles import PautasRepository, PlanItem
+from .registry import get_active_repository
+
+BUNDLE_MAGIC = b"PRNBNDL1"
+BUNDLE_FORMAT_VERSION = 1
+MASK_SIZE = SET_SIZE  # bytes per pauta mask, serialized PautaSets
+SECTION_ALIGNMENT = 8
+
+# magic, format version, pautas, plans, buckets, start age (hundredths),
+# pautas / plans / buckets / names offsets, total size, norm version
+_HEADER = struct.Struct("<8sHHHHhxxIIIII16s")
+_PAUTA = struct.Struct("<HBBHHBB")
+_PLAN = struct.Struct(f"<{MASK_SIZE}s{MASK_SIZE}s{MASK_SIZE}s")
+HEADER_SIZE = _HEADER.size
+
+DELTA_MAGIC = b"PRNDLTA1"
+DELTA_FORMAT_VERSION = 1
+DIGEST_SIZE = 16
+# magic, format version, base size, base digest, target size, target digest,
+# followed by the zlib-compressed instructions
+_DELTA_HEADER = struct.Struct(f"<8sHxxI{DIGEST_SIZE}sI{DIGEST_SIZE}s")
+_COPY = struct.Struct("<BII")  # op, offset in the base, length
+_INSERT = struct.Struct("<BI")  # op, length of the literal bytes that follow
+OP_COPY = 0
+OP_INSERT = 1
+# Coincidencia mínima para copiar desde la base en lugar de insertar
+MIN_COPY = 8
+
+
+class BundleHeader(NamedTuple):
+    format_version: int
+    pautas: int
+    plans: int
+    buckets: int
+    start_age: int
+    pautas_offset: int
+    plans_offset: int
+    buckets_offset: int
+    names_offset: int
+    size: int
+    norm_version: str
+
+
+class BundlePlan(NamedTuple):
+    """A plan as pauta masks, readable with PautaSet.from_bytes"""
+
+    evaluate: bytes
+    category_a: bytes
+    category_b: bytes
+
+
+def _plan_masks(items: Tuple[PlanItem, ...]) -> bytes:
+    return _PLAN.pack(
+        PautaSet(item.pauta.id for item in items).to_bytes(),
+        PautaSet(item.pauta.id for item in items if item.is_a).to_bytes(),
+        PautaSet(item.pauta.id for item in items if item.is_b).to_bytes(),
+    )
+
+
+def _pad(buffer: bytearray):
+    buffer.extend(bytes(-len(buffer) % SECTION_ALIGNMENT))
+
+
+def build_bundle(repo: Optional[PautasRepository] = None) -> bytes:
+    """
+    Compile a repository and its age-bucket plan table into a bundle.
+
+    Args:
+        repo: Repository to compile (defaults to the active norm set)
+    """
+    repo = repo or get_active_repository()
+    if max(pauta.id for pauta in repo.pautas) > MASK_SIZE * 8:
+        raise ValueError(f"Pauta ids above {MASK_SIZE * 8} do not fit a bundle mask")
+    # Tabla de planes por centésimo de año, de la primera a la última ventana
+    start, table = repo.plan_table()
+
+    body = bytearray(HEADER_SIZE)
+    pautas_offset = len(body)
+    for pauta in repo.pautas:
+        body += _PAUTA.pack(
+            pauta.id,
+            pauta.area.id,
+            pauta.tipo_pauta.id,
+            pauta.p75_hundredths,
+            pauta.p90_hundredths,
+            pauta.approval.required,
+            pauta.approval.trials,
+        )
+    _pad(body)
+
+    # Planes distintos, en orden de primera aparición
+    plan_indexes: Dict[bytes, int] = {}
+    buckets: List[int] = []
+    for items in table:
+        masks = _plan_masks(items)
+        buckets.append(plan_indexes.setdefault(masks, len(plan_indexes)))
+    plans_offset = len(body)
+    for masks in plan_indexes:
+        body += masks
+    buckets_offset = len(body)
+    body += struct.pack(f"<{len(buckets)}H", *buckets)
+    _pad(body)
+
+    names = [pauta.name.encode("utf-8") for pauta in repo.pautas]
+    names_offset = len(body)
+    end = 0
+    ends = []
+    for name in names:
+        end += len(name)
+        ends.append(end)
+    body += struct.pack(f"<{len(ends)}I", *ends)
+    body += b"".join(names)
+    _pad(body)
+
+    _HEADER.pack_into(
+        body,
+        0,
+        BUNDLE_MAGIC,
+        BUNDLE_FORMAT_VERSION,
+        len(repo.pautas),
+        len(plan_indexes),
+        len(buckets),
+        start,
+        pautas_offset,
+        plans_offset,
+        buckets_offset,
+        names_offset,
+        len(body),
+        repo.version.encode("ascii"),
+    )
+    return bytes(body)
+
+
+def read_header(bundle) -> BundleHeader:
+    """
+    Parse and check the header of a bundle.
+
+    Raises:
+        ValueError: If the data is not a complete bundle of this format version
+    """
+    if len(bundle) < HEADER_SIZE:
+        raise ValueError("Truncated bundle")
+    magic, version, *fields, norm_version = _HEADER.unpack_from(bundle, 0)
+    if magic != BUNDLE_MAGIC or version != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Not a version {BUNDLE_FORMAT_VERSION} plan bundle")
+    header = BundleHeader(version, *fields, norm_version.decode("ascii"))
+    if header.size != len(bundle):
+        raise ValueError("Truncated bundle")
+    return header
+
+
+class PlanBundle:
+    """
+    Reads plans from a bundle (bytes, or an mmap of the file) without
+    copying it. Mirrors the lookups the Android client performs.
+    """
+
+    def __init__(self, bundle):
+        self.header = read_header(bundle)
+        self._bundle = bundle
+
+    def plan_for_hundredths(self, age: int) -> BundlePlan:
+        """The plan masks for an age in integer hundredths of a year"""
+        header = self.header
+        bucket = age - header.start_age
+        if not 0 <= bucket < header.buckets:
+            empty = bytes(MASK_SIZE)
+            return BundlePlan(empty, empty, empty)
+        (plan,) = struct.unpack_from(
+            "<H", self._bundle, header.buckets_offset + 2 * bucket
+        )
+        return BundlePlan(
+            *_PLAN.unpack_from(self._bundle, header.plans_offset + plan * _PLAN.size)
+        )
+
+    def pauta_ids(self) -> Tuple[int, ...]:
+        offset = self.header.pautas_offset
+        return tuple(
+            _PAUTA.unpack_from(self._bundle, offset + index * _PAUTA.size)[0]
+            for index in range(self.header.pautas)
+        )
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()[:DIGEST_SIZE]
+
+
+def make_delta(base: bytes, target: bytes) -> bytes:
+    """
+    Encode target as copy/insert instructions against base.
+
+    Every MIN_COPY-byte window of the base is indexed by its first offset;
+    the target is scanned greedily, extending each indexed match as far as
+    it goes and inserting the bytes that match nothing.
+    """
+    index: Dict[bytes, int] = {}
+    for offset in range(len(base) - MIN_COPY + 1):
+        index.setdefault(base[offset : offset + MIN_COPY], offset)
+
+    ops = bytearray()
+    literal_start = 0
+    position = 0
+    while position + MIN_COPY <= len(target):
+        source = index.get(target[position : position + MIN_COPY])
+        if source is None:
+            position += 1
+            continue
+        length = MIN_COPY
+        while (
+            position + length < len(target)
+            and source + length < len(base)
+            and target[position + length] == base[source + length]
+        ):
+            length += 1
+        if literal_start < position:
+            ops += _INSERT.pack(OP_INSERT, position - literal_start)
+            ops += target[literal_start:position]
+        ops += _COPY.pack(OP_COPY, source, length)
+        position += length
+        literal_start = position
+    if literal_start < len(target):
+        ops += _INSERT.pack(OP_INSERT, len(target) - literal_start)
+        ops += target[literal_start:]
+
+    return (
+        _DELTA_HEADER.pack(
+            DELTA_MAGIC,
+            DELTA_FORMAT_VERSION,
+            len(base),
+            _digest(base),
+            len(target),
+            _digest(target),
+        )
+        + zlib.compress(bytes(ops), 9)
+    )
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """
+    Rebuild the target of a delta from its base.
+
+    Raises:
+        ValueError: If the delta is malformed, was made for another base or
+            does not reproduce its target
+    """
+    if len(delta) < _DELTA_HEADER.size:
+        raise ValueError("Truncated bundle delta")
+    magic, version, base_size, base_digest, target_size, target_digest = (
+        _DELTA_HEADER.unpack_from(delta, 0)
+    )
+    if magic != DELTA_MAGIC or version != DELTA_FORMAT_VERSION:
+        raise ValueError(f"Not a version {DELTA_FORMAT_VERSION} bundle delta")
+    if len(base) != base_size or _digest(base) != base_digest:
+        raise ValueError("The delta was made for a different base bundle")
+
+    try:
+        ops = zlib.decompress(delta[_DELTA_HEADER.size :])
+    except zlib.error as error:
+        raise ValueError(f"Corrupt bundle delta: {error}") from error
+    target = bytearray()
+    position = 0
+    while position < len(ops):
+        op = ops[position]
+        if op == OP_COPY:
+            _, offset, length = _COPY.unpack_from(ops, position)
+            if offset + length > len(base):
+                raise ValueError("Delta copies past the end of the base")
+            target += base[offset : offset + length]
+            position += _COPY.size
+        elif op == OP_INSERT:
+            _, length = _INSERT.unpack_from(ops, position)
+            position += _INSERT.size
+            target += ops[position : position + length]
+            position += length
+        else:
+            raise ValueError(f"Unknown delta operation {op}")
+
+    if len(target) != target_size or _digest(target) != target_digest:
+        raise ValueError("The delta does not reproduce its target bundle")
+    return bytes(target)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as source:
+        return source.read()
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as target:
+        target.write(data)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Paquete de planes para la aplicación Android y actualizaciones delta"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="compilar el paquete de planes")
+    export.add_argument("output", help="archivo del paquete")
+    export.add_argument("--norms", help="tabla de normas CSV (por defecto la activa)")
+    diff = commands.add_parser("diff", help="generar un delta entre dos paquetes")
+    diff.add_argument("base", help="paquete instalado en el dispositivo")
+    diff.add_argument("target", help="paquete nuevo")
+    diff.add_argument("output", help="archivo delta")
+    apply = commands.add_parser("apply", help="aplicar un delta a un paquete")
+    apply.add_argument("base", help="paquete instalado en el dispositivo")
+    apply.add_argument("delta", help="archivo delta")
+    apply.add_argument("output", help="paquete resultante")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        repo = PautasRepository(args.norms) if args.norms else None
+        bundle = build_bundle(repo)
+        _write(args.output, bundle)
+        header = read_header(bundle)
+        print(
+            f"{args.output}: {len(bundle)} bytes, {header.plans} planes distintos"
+            f" para {header.buckets} edades, normas {header.norm_version}"
+        )
+    elif args.command == "diff":
+        target = _read(args.target)
+        read_header(target)
+        delta = make_delta(_read(args.base), target)
+        _write(args.output, delta)
+        print(f"{args.output}: {len(delta)} bytes (paquete completo: {len(target)} bytes)")
+    else:
+        bundle = apply_delta(_read(args.base), _read(args.delta))
+        read_header(bundle)
+        _write(args.output, bundle)
+        print(f"{args.output}: {len(bundle)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
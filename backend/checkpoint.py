@@ -0,0 +1,61 @@
+"""
+Binary checkpoints of fixed-size counter arrays.
+
+A checkpoint is a caller-defined header followed by the arrays in order.
+The counters are always stored little-endian, whatever the host byte order,
+to match the little-endian headers. Saving writes a temporary file next to
+the checkpoint and renames it over the old one, so a crash while saving
+leaves the previous checkpoint intact.
+"""
+
+import os
+import sys
+from array import array
+from typing import BinaryIO, Sequence
+
+_SWAP = sys.byteorder == "big"
+
+
+def save_arrays(path: str, header: bytes, arrays: Sequence[array]):
+    """
+    Atomically replace the checkpoint at path with header and arrays.
+
+    Args:
+        path: Checkpoint file
+        header: Packed header to write before the arrays
+        arrays: Arrays to write, in the order load_arrays reads them
+    """
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as checkpoint:
+            checkpoint.write(header)
+            for values in arrays:
+                if _SWAP:
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(checkpoint)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        # No dejar el temporal a medio escribir junto al checkpoint
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_arrays(checkpoint: BinaryIO, arrays: Sequence[array]):
+    """
+    Fill arrays in place from a checkpoint positioned after its header.
+
+    Raises:
+        EOFError: If the checkpoint ends before every array is filled
+    """
+    for target in arrays:
+        loaded = array(target.typecode)
+        loaded.fromfile(checkpoint, len(target))
+        if _SWAP:
+            loaded.byteswap()
+        target[:] = loaded
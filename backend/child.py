@@ -1,6 +1,43 @@
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from .fixedpoint import HUNDREDTH, HUNDREDTHS_PER_YEAR, from_hundredths, to_hundredths
+from .instrumentation import timed
+
+DAYS_IN_YEAR = 365.25  # Account for leap years
+FULL_TERM_WEEKS = 40
+PRETERM_WEEKS = 37  # Correction applies to children born before this week
+CORRECTION_AGE_LIMIT = 2  # Correction applies to children under this age
+
+
+CORRECTION_AGE_LIMIT_HUNDREDTHS = CORRECTION_AGE_LIMIT * HUNDREDTHS_PER_YEAR
+# Las claves vienen de datos del cliente: caché acotada, cubre ~11 años de días
+AGE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=AGE_CACHE_SIZE)
+def _age_from_days(days: int) -> int:
+    """Convert an age in days to integer hundredths of a year"""
+    return to_hundredths(Decimal(days / DAYS_IN_YEAR).quantize(HUNDREDTH))
+
+
+@lru_cache(maxsize=AGE_CACHE_SIZE)
+def _prematurity_correction(gestational_age_weeks: int) -> int:
+    """Convert the weeks of prematurity to integer hundredths of a year"""
+    weeks_premature = FULL_TERM_WEEKS - gestational_age_weeks
+    return to_hundredths(Decimal(weeks_premature / 52).quantize(HUNDREDTH))
+
+
+def _corrected_age(chronological_age: int, gestational_age_weeks: int) -> int:
+    """Apply the prematurity correction to an age in hundredths when it applies"""
+    if (
+        chronological_age < CORRECTION_AGE_LIMIT_HUNDREDTHS
+        and gestational_age_weeks < PRETERM_WEEKS
+    ):
+        return chronological_age - _prematurity_correction(gestational_age_weeks)
+    return chronological_age
 
 
 class Child:
@@ -34,13 +71,7 @@ class Child:
         Returns:
             Age in decimal years (e.g., 1.65 for 1 year and ~8 months)
         """
-        # Calculate age in days
-        delta = self.survey_date - self.birth_date
-        days_in_year = 365.25  # Account for leap years
-
-        # Convert to decimal years with 2 decimal precision
-        age_years = Decimal(delta.days / days_in_year).quantize(Decimal("0.01"))
-        return age_years
+        return from_hundredths(self.age_hundredths())
 
     def calculate_corrected_age(self) -> Decimal:
         """
@@ -50,34 +81,80 @@ class Child:
         Returns:
             Corrected age in decimal years
         """
-        chronological_age = self.calculate_age()
-
-        # Correction only applies to children under 2 years born before 37 weeks
-        if chronological_age < 2 and self.gestational_age_weeks < 37:
-            # Calculate weeks of prematurity
-            weeks_premature = 40 - self.gestational_age_weeks
+        return from_hundredths(self.corrected_age_hundredths())
 
-            # Convert weeks to decimal years
-            years_correction = Decimal(weeks_premature / 52).quantize(Decimal("0.01"))
+    def age_hundredths(self) -> int:
+        """Chronological age in integer hundredths of a year (e.g., 165 for 1.65)"""
+        # Calculate age in days
+        delta = self.survey_date - self.birth_date
 
-            # Apply correction
-            corrected_age = chronological_age - years_correction
-            return corrected_age
+        # Convert to hundredths of a year
+        return _age_from_days(delta.days)
 
-        # No correction needed
-        return chronological_age
+    @timed("child.corrected_age")
+    def corrected_age_hundredths(self) -> int:
+        """Corrected age in integer hundredths of a year"""
+        return _corrected_age(self.age_hundredths(), self.gestational_age_weeks)
 
     def __str__(self) -> str:
         """
         String representation showing both chronological and corrected ages.
         """
-        chronological_age = self.calculate_age()
-        corrected_age = self.calculate_corrected_age()
+        chronological_age = self.age_hundredths()
+        corrected_age = _corrected_age(chronological_age, self.gestational_age_weeks)
 
-        result = f"Edad: {chronological_age} años"
+        result = f"Edad: {from_hundredths(chronological_age)} años"
 
         # Add corrected age only if different from chronological age
         if corrected_age != chronological_age:
-            result += f", Edad corregida: {corrected_age} años"
+            result += f", Edad corregida: {from_hundredths(corrected_age)} años"
 
         return result
+
+
+def calculate_cohort_ages(
+    birth_dates: Iterable[date],
+    survey_dates: Iterable[date],
+    gestational_ages_weeks: Iterable[int],
+) -> Tuple[List[Decimal], List[Decimal]]:
+    """
+    Calculate chronological and corrected ages for a whole cohort in one pass.
+
+    Applies the same rules as Child.calculate_age and
+    Child.calculate_corrected_age and returns identical values, but each
+    distinct day count and gestational age is converted only once.
+
+    Args:
+        birth_dates: Dates of birth
+        survey_dates: Dates of the survey/assessment, aligned with birth_dates
+        gestational_ages_weeks: Gestational ages in completed weeks, aligned with birth_dates
+
+    Returns:
+        A (chronological ages, corrected ages) pair of lists
+    """
+    chronological_ages, corrected_ages = calculate_cohort_age_hundredths(
+        birth_dates, survey_dates, gestational_ages_weeks
+    )
+    return (
+        [from_hundredths(age) for age in chronological_ages],
+        [from_hundredths(age) for age in corrected_ages],
+    )
+
+
+def calculate_cohort_age_hundredths(
+    birth_dates: Iterable[date],
+    survey_dates: Iterable[date],
+    gestational_ages_weeks: Iterable[int],
+) -> Tuple[List[int], List[int]]:
+    """
+    Same as calculate_cohort_ages, with ages in integer hundredths of a year.
+    """
+    chronological_ages = [
+        _age_from_days(survey_date.toordinal() - birth_date.toordinal())
+        for birth_date, survey_date in zip(birth_dates, survey_dates)
+    ]
+    corrected_ages = [
+        _corrected_age(age, weeks)
+        for age, weeks in zip(chronological_ages, gestational_ages_weeks)
+    ]
+    return chronological_ages, corrected_ages
@@ -0,0 +1,35 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+
+# Ages and norm thresholds are stored as integer hundredths of a year
+HUNDREDTHS_PER_YEAR = 100
+HUNDREDTH = Decimal("0.01")
+
+
+def to_hundredths(value: Decimal) -> int:
+    """
+    Convert a value with at most two decimals to integer hundredths.
+
+    Raises:
+        ValueError: If the value has more than two significant decimals
+    """
+    hundredths = exact_hundredths(value)
+    if hundredths is None:
+        raise ValueError(f"{value} has more than two decimals")
+    return hundredths
+
+
+def exact_hundredths(value: Decimal) -> Optional[int]:
+    """Return the value in integer hundredths, or None if it is not on the 0.01 grid"""
+    scaled = value.scaleb(2)
+    hundredths = int(scaled)
+    if hundredths != scaled:
+        return None
+    return hundredths
+
+
+@lru_cache(maxsize=4096)
+def from_hundredths(hundredths: int) -> Decimal:
+    """Convert integer hundredths back to a Decimal with two decimals (e.g., 150 -> 1.50)"""
+    return Decimal(hundredths).scaleb(-2)
@@ -0,0 +1,34 @@
+from datetime import date
+from decimal import Decimal
+from typing import Union
+
+# Separadores usados en Argentina (es_AR): 1.234,56
+DECIMAL_SEPARATOR = ","
+THOUSANDS_SEPARATOR = "."
+
+
+def format_decimal(value: Union[Decimal, int, float], places: int = 2) -> str:
+    """
+    Format a number with Spanish separators without touching the process locale.
+
+    Args:
+        value: Number to format
+        places: Number of decimal places to show
+
+    Returns:
+        The formatted number (e.g., "1.234,56")
+    """
+    formatted = f"{value:,.{places}f}"
+    return formatted.translate(
+        str.maketrans({",": THOUSANDS_SEPARATOR, ".": DECIMAL_SEPARATOR})
+    )
+
+
+def format_date(value: date) -> str:
+    """Format a date as dd/mm/aaaa"""
+    return f"{value.day:02d}/{value.month:02d}/{value.year:04d}"
+
+
+def format_age(value: Decimal) -> str:
+    """Format an age in decimal years (e.g., "3,32 años")"""
+    return f"{format_decimal(value)} años"
@@ -0,0 +1,232 @@
+"""
+Lightweight per-stage instrumentation for the assessment flow.
+
+Stages are wrapped with the timed() decorator or the stage() context manager.
+While instrumentation is disabled (the default) timed methods run unwrapped
+and stage() reduces to a flag check.
+When enabled, every stage run is counted, its duration is added to a
+cumulative total and a log2 histogram, and each registered hook is called
+with (stage, seconds).
+
+Set PRUNAPE_PROFILE=1 to enable it at startup and print the report to stderr
+at exit, or PRUNAPE_PROFILE=path.json to write the report there instead.
+"""
+
+import atexit
+import json
+import os
+import sys
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+HISTOGRAM_BUCKETS = 32  # Bucket i counts durations in [2^(i-1), 2^i) microseconds
+
+Hook = Callable[[str, float], None]
+
+_enabled = False
+_hooks: List[Hook] = []
+
+
+class StageStats:
+    """Count, cumulative time and duration histogram of one stage"""
+
+    __slots__ = ("count", "total", "maximum", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "max_us": self.maximum * 1e6,
+            "histogram_log2_us": self.histogram,
+        }
+
+
+_stats: Dict[str, StageStats] = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+    for owner, attribute, _, wrapper in _methods:
+        setattr(owner, attribute, wrapper)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    for owner, attribute, function, _ in _methods:
+        setattr(owner, attribute, function)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_hook(hook: Hook):
+    """Call hook(stage, seconds) after every instrumented stage while enabled"""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook):
+    _hooks.remove(hook)
+
+
+def reset():
+    """Discard everything recorded so far"""
+    _stats.clear()
+
+
+def record(stage_name: str, seconds: float):
+    """Record one run of a stage and notify the hooks"""
+    stats = _stats.get(stage_name)
+    if stats is None:
+        stats = _stats[stage_name] = StageStats()
+    stats.record(seconds)
+    for hook in _hooks:
+        hook(stage_name, seconds)
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, perf_counter() - self.started)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing a block as the given stage"""
+    if not _enabled:
+        return _NO_STAGE
+    return _Stage(name)
+
+
+def _timed_wrapper(name: str, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, perf_counter() - started)
+
+    return wrapper
+
+
+# (owner class, attribute, original function, timed wrapper) of instrumented methods
+_methods: List[Tuple[type, str, Callable, Callable]] = []
+
+
+class timed:
+    """
+    Decorator timing every call of a method as the given stage.
+
+    On a method, the class attribute is swapped between the original function
+    and a timed wrapper by enable() and disable(), so a disabled method runs
+    with no extra call at all. On a plain function it falls back to a wrapper
+    that checks the enabled flag on every call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.function: Optional[Callable] = None
+
+    def __call__(self, *args, **kwargs):
+        if self.function is None:
+            self.function = args[0]
+            wraps(self.function)(self)
+            return self
+        if not _enabled:
+            return self.function(*args, **kwargs)
+        started = perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            record(self.name, perf_counter() - started)
+
+    def __set_name__(self, owner: type, attribute: str):
+        wrapper = _timed_wrapper(self.name, self.function)
+        _methods.append((owner, attribute, self.function, wrapper))
+        setattr(owner, attribute, wrapper if _enabled else self.function)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence, e.g. of latencies"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def report() -> Dict[str, Dict]:
+    """Everything recorded so far, by stage"""
+    return {name: stats.as_dict() for name, stats in sorted(_stats.items())}
+
+
+def dump(stream: Optional[TextIO] = None):
+    """Print a per-stage summary"""
+    stream = stream or sys.stderr
+    stream.write(
+        f"{'stage':<32} {'count':>10} {'total ms':>10} {'mean us':>9} {'max us':>9}\n"
+    )
+    for name, stats in report().items():
+        stream.write(
+            f"{name:<32} {stats['count']:>10} {stats['total_seconds'] * 1e3:>10.2f} "
+            f"{stats['mean_us']:>9.1f} {stats['max_us']:>9.1f}\n"
+        )
+
+
+def dump_json(path: str):
+    """Write the report as JSON"""
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(report(), output, indent=2)
+
+
+def _dump_at_exit(target: str):
+    if not _stats:
+        return
+    if target in ("1", "true", "stderr"):
+        dump()
+    else:
+        dump_json(target)
+
+
+_PROFILE_TARGET = os.environ.get("PRUNAPE_PROFILE")
+if _PROFILE_TARGET:
+    enable()
+    atexit.register(_dump_at_exit, _PROFILE_TARGET)
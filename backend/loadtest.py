@@ -0,0 +1,129 @@
+"""
+Local load test for backend.server: keeps a number of keep-alive connections
+busy and reports latency percentiles and throughput.
+
+Usage:
+    python -m backend.loadtest [--port 8080] [--endpoint plan] [--concurrency 50]
+                               [--requests 10000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from .instrumentation import percentile
+from .server import DEFAULT_HOST, DEFAULT_PORT
+
+
+def _random_payload(endpoint: str, rng: random.Random) -> Dict:
+    birth_date = date(2015, 1, 1) + timedelta(days=rng.randint(0, 1500))
+    survey_date = birth_date + timedelta(days=rng.randint(10, 2400))
+    payload = {
+        "birth_date": birth_date.isoformat(),
+        "survey_date": survey_date.isoformat(),
+        "gestational_age_weeks": rng.randint(28, 41),
+    }
+    if endpoint == "score":
+        payload["answers"] = {}
+    return payload
+
+
+async def _client(
+    host: str,
+    port: int,
+    endpoint: str,
+    requests: int,
+    latencies: List[float],
+    errors: List[int],
+    seed: int,
+):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            body = json.dumps(_random_payload(endpoint, rng)).encode("utf-8")
+            request = (
+                f"POST /{endpoint} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "\r\n"
+            ).encode("latin-1") + body
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if b" 200 " not in status_line:
+                errors.append(1)
+    finally:
+        writer.close()
+
+
+async def run_load_test(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    endpoint: str = "plan",
+    concurrency: int = 50,
+    requests: int = 10000,
+) -> Dict[str, float]:
+    """Send the requests over the given number of connections and summarize latency"""
+    latencies: List[float] = []
+    errors: List[int] = []
+    per_client = max(1, requests // concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(host, port, endpoint, per_client, latencies, errors, seed)
+            for seed in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de backend.server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--endpoint", choices=("plan", "score"), default="plan")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args(argv)
+    summary = asyncio.run(
+        run_load_test(
+            args.host, args.port, args.endpoint, args.concurrency, args.requests
+        )
+    )
+    print(
+        f"{summary['requests']} solicitudes ({summary['errors']} errores) en "
+        f"{summary['seconds']:.2f} s: {summary['requests_per_second']:.0f} req/s, "
+        f"p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
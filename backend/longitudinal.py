@@ -0,0 +1,121 @@
+"""
+Longitudinal screening: children are assessed on repeated visits and each
+visit only administers what is still open for them.
+
+A ChildHistory keeps the pautas a child has already passed and the ones
+failed and not passed since. On a new visit the pending items are the plan
+for the new age minus the passed pautas: pautas newly entering the
+evaluation window, failed pautas still in it and any left unanswered.
+Passed pautas still in the window are carried over as passes when scoring.
+"""
+
+import struct
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from .child import Child
+from .fixedpoint import to_hundredths
+from .pautaset import EMPTY, SET_SIZE, PautaSet
+from .percetiles import PautasRepository, PlanItem
+from .scoring import AssessmentPlan, AssessmentResult, build_plan, score
+
+_STATE_VERSION = 2
+_STATE_HEADER = struct.Struct("<BHh")  # version, visits, last age
+# Versión 1: cantidades de pautas aprobadas y falladas seguidas de sus ids
+_STATE_V1_COUNTS = struct.Struct("<BB")
+_NO_AGE = -32768
+
+
+class ChildHistory(NamedTuple):
+    """Per-child screening state carried between visits"""
+
+    passed: PautaSet = EMPTY
+    failed: PautaSet = EMPTY
+    visits: int = 0
+    last_corrected_age: Optional[int] = None  # In hundredths of a year
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary state: a header and two 16-byte sets"""
+        header = _STATE_HEADER.pack(
+            _STATE_VERSION,
+            self.visits,
+            _NO_AGE if self.last_corrected_age is None else self.last_corrected_age,
+        )
+        return header + self.passed.to_bytes() + self.failed.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, state: bytes) -> "ChildHistory":
+        """Restore a history serialized with to_bytes (current or version 1 format)"""
+        version, visits, age = _STATE_HEADER.unpack_from(state)
+        offset = _STATE_HEADER.size
+        if version == _STATE_VERSION:
+            passed = PautaSet.from_bytes(state[offset : offset + SET_SIZE])
+            offset += SET_SIZE
+            failed = PautaSet.from_bytes(state[offset : offset + SET_SIZE])
+        elif version == 1:
+            passed_count, failed_count = _STATE_V1_COUNTS.unpack_from(state, offset)
+            offset += _STATE_V1_COUNTS.size
+            passed = PautaSet(state[offset : offset + passed_count])
+            offset += passed_count
+            failed = PautaSet(state[offset : offset + failed_count])
+        else:
+            raise ValueError(f"Unsupported history state version: {version}")
+        return cls(passed, failed, visits, None if age == _NO_AGE else age)
+
+
+class VisitPlan(NamedTuple):
+    """The full plan for a visit and the items that still have to be administered"""
+
+    plan: AssessmentPlan
+    pending: Tuple[PlanItem, ...]
+    carried_over: Tuple[int, ...]  # Passed earlier and still in the window
+
+
+def plan_visit(
+    history: ChildHistory, child: Child, repo: Optional[PautasRepository] = None
+) -> VisitPlan:
+    """
+    Build the plan for a new visit, keeping only the items not passed before.
+    """
+    plan = build_plan(child, repo)
+    passed = history.passed
+    pending = []
+    carried_over = []
+    for item in plan.items:
+        if item.pauta.id in passed:
+            carried_over.append(item.pauta.id)
+        else:
+            pending.append(item)
+    return VisitPlan(plan, tuple(pending), tuple(carried_over))
+
+
+def record_visit(
+    history: ChildHistory, visit: VisitPlan, answers: Mapping[int, bool]
+) -> Tuple[AssessmentResult, ChildHistory]:
+    """
+    Score the answers of a visit and return the result with the updated history.
+
+    Args:
+        history: History before the visit
+        visit: Plan built with plan_visit
+        answers: Pass (True) or fail (False) for the pending pauta ids
+
+    Raises:
+        ValueError: If an answer targets a pauta that was not pending
+    """
+    pending_ids = {item.pauta.id for item in visit.pending}
+    extra = [pauta_id for pauta_id in answers if pauta_id not in pending_ids]
+    if extra:
+        raise ValueError(f"Answers for pautas that were not pending: {sorted(extra)}")
+
+    full_answers = dict.fromkeys(visit.carried_over, True)
+    full_answers.update(answers)
+    result = score(visit.plan, full_answers)
+
+    newly_passed = result.passed_set - PautaSet(visit.carried_over)
+    updated = ChildHistory(
+        history.passed | newly_passed,
+        (history.failed | result.failed_set) - newly_passed,
+        history.visits + 1,
+        to_hundredths(result.corrected_age),
+    )
+    return result, updated
@@ -0,0 +1,218 @@
+"""
+Estimation of P75/P90 norms from local screening data.
+
+Observations (corrected age, pauta id, pass/fail) are accumulated into fixed
+0.01-year bins per pauta, so any number of observations fits in bounded
+memory and estimators from different shards can be merged. The age at which
+75% and 90% of children pass a pauta is read from an isotonic (monotone
+non-decreasing) fit of the binned pass rates, and the result is written as a
+norm table that PautasRepository(norms_path=...) loads directly.
+"""
+
+import csv
+import struct
+from array import array
+from decimal import Decimal
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .checkpoint import load_arrays, save_arrays
+from .fixedpoint import from_hundredths, to_hundredths
+from .percetiles import (
+    MAX_PAUTA_ID,
+    NORMS_HEADER,
+    PautasRepository,
+    check_pauta_ids,
+    get_shared_repository,
+)
+from .scoring import AssessmentResult
+
+AGE_BINS = 800  # 0.00-7.99 years in 0.01 steps; other ages are clamped
+P75 = 0.75
+P90 = 0.90
+DEFAULT_MIN_OBSERVATIONS = 200
+
+_CHECKPOINT_MAGIC = b"PRNNORM1"
+_CHECKPOINT_HEADER = struct.Struct("<8sII")  # magic, pautas, bins
+
+
+class EstimatedNorm(NamedTuple):
+    """Estimated thresholds of a pauta; None when there was not enough data"""
+
+    pauta_id: int
+    observations: int
+    p75: Optional[Decimal]
+    p90: Optional[Decimal]
+
+
+def isotonic_fit(rates: List[float], weights: List[float]) -> List[float]:
+    """
+    Weighted pool-adjacent-violators fit: the closest non-decreasing sequence
+    to rates, in weighted least squares.
+    """
+    blocks: List[List[float]] = []  # [mean, weight, length]
+    for rate, weight in zip(rates, weights):
+        blocks.append([rate, weight, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean, weight, length = blocks.pop()
+            previous = blocks[-1]
+            total = previous[1] + weight
+            previous[0] = (previous[0] * previous[1] + mean * weight) / total
+            previous[1] = total
+            previous[2] += length
+    fitted: List[float] = []
+    for mean, _, length in blocks:
+        fitted.extend([mean] * length)
+    return fitted
+
+
+class NormEstimator:
+    """Accumulates pass/fail observations per pauta and 0.01-year age bin"""
+
+    def __init__(self):
+        size = (MAX_PAUTA_ID + 1) * AGE_BINS
+        self.passed = array("Q", bytes(8 * size))
+        self.total = array("Q", bytes(8 * size))
+
+    @staticmethod
+    def _offset(pauta_id: int, age_hundredths: int) -> int:
+        age_bin = min(max(age_hundredths, 0), AGE_BINS - 1)
+        return pauta_id * AGE_BINS + age_bin
+
+    def add(self, age: Decimal, pauta_id: int, passed: bool):
+        """Record one observation of a pauta at a corrected age"""
+        self.add_hundredths(to_hundredths(age), pauta_id, passed)
+
+    def add_hundredths(self, age: int, pauta_id: int, passed: bool):
+        """
+        Record one observation with the age in integer hundredths.
+
+        Raises:
+            ValueError: If the pauta id is above MAX_PAUTA_ID
+        """
+        check_pauta_ids((pauta_id,))
+        offset = self._offset(pauta_id, age)
+        self.total[offset] += 1
+        if passed:
+            self.passed[offset] += 1
+
+    def add_observations(self, observations: Iterable[Tuple[Decimal, int, bool]]):
+        for age, pauta_id, passed in observations:
+            self.add(age, pauta_id, passed)
+
+    def add_result(self, result: AssessmentResult):
+        """Record every answered pauta of a scored assessment"""
+        age = to_hundredths(result.corrected_age)
+        for pauta_id in result.passed:
+            self.add_hundredths(age, pauta_id, True)
+        for pauta_id in result.failed:
+            self.add_hundredths(age, pauta_id, False)
+
+    def merge(self, other: "NormEstimator") -> "NormEstimator":
+        """Add the observations of another estimator into this one"""
+        for mine, theirs in ((self.passed, other.passed), (self.total, other.total)):
+            for index, value in enumerate(theirs):
+                if value:
+                    mine[index] += value
+        return self
+
+    def save(self, path: str):
+        """Checkpoint the binned counts to a binary file, replacing it atomically"""
+        save_arrays(
+            path,
+            _CHECKPOINT_HEADER.pack(_CHECKPOINT_MAGIC, MAX_PAUTA_ID + 1, AGE_BINS),
+            (self.passed, self.total),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NormEstimator":
+        """Restore counts saved with save"""
+        estimator = cls()
+        with open(path, "rb") as checkpoint:
+            magic, pautas, bins = _CHECKPOINT_HEADER.unpack(
+                checkpoint.read(_CHECKPOINT_HEADER.size)
+            )
+            if magic != _CHECKPOINT_MAGIC or (pautas, bins) != (
+                MAX_PAUTA_ID + 1,
+                AGE_BINS,
+            ):
+                raise ValueError(f"{path} is not a compatible norm checkpoint")
+            load_arrays(checkpoint, (estimator.passed, estimator.total))
+        return estimator
+
+    def observations(self, pauta_id: int) -> int:
+        start = pauta_id * AGE_BINS
+        return sum(self.total[start : start + AGE_BINS])
+
+    def estimate(self, pauta_id: int, quantile: float) -> Optional[Decimal]:
+        """
+        Youngest age at which the fitted pass rate of a pauta reaches the
+        quantile, or None if it never does.
+        """
+        start = pauta_id * AGE_BINS
+        ages: List[int] = []
+        rates: List[float] = []
+        weights: List[float] = []
+        for age_bin in range(AGE_BINS):
+            total = self.total[start + age_bin]
+            if total:
+                ages.append(age_bin)
+                rates.append(self.passed[start + age_bin] / total)
+                weights.append(total)
+        for age, rate in zip(ages, isotonic_fit(rates, weights)):
+            if rate >= quantile:
+                return from_hundredths(age)
+        return None
+
+    def estimate_norms(
+        self,
+        repo: Optional[PautasRepository] = None,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+    ) -> List[EstimatedNorm]:
+        """Estimate P75 and P90 for every pauta of the repository"""
+        repo = repo or get_shared_repository()
+        norms = []
+        for pauta in repo.pautas:
+            observations = self.observations(pauta.id)
+            if observations < min_observations:
+                norms.append(EstimatedNorm(pauta.id, observations, None, None))
+                continue
+            p75 = self.estimate(pauta.id, P75)
+            p90 = self.estimate(pauta.id, P90)
+            if p75 is not None and p90 is not None and p90 < p75:
+                p90 = p75
+            norms.append(EstimatedNorm(pauta.id, observations, p75, p90))
+        return norms
+
+    def write_norm_table(
+        self,
+        path: str,
+        repo: Optional[PautasRepository] = None,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+    ) -> List[EstimatedNorm]:
+        """
+        Write a norm table in the PautasRepository CSV format. Pautas without
+        enough data, or whose pass rate never reaches a quantile, keep the
+        threshold of the base repository.
+
+        Returns:
+            The estimates used to build the table
+        """
+        repo = repo or get_shared_repository()
+        norms = self.estimate_norms(repo, min_observations)
+        with open(path, "w", newline="", encoding="utf-8") as norms_file:
+            writer = csv.writer(norms_file, lineterminator="\n")
+            writer.writerow(NORMS_HEADER)
+            for pauta, norm in zip(repo.pautas, norms):
+                p75 = norm.p75 if norm.p75 is not None else pauta.p75
+                p90 = norm.p90 if norm.p90 is not None else pauta.p90
+                writer.writerow(
+                    (
+                        pauta.id,
+                        pauta.area.id,
+                        p75,
+                        max(p75, p90),
+                        pauta.tipo_pauta.id,
+                        pauta.rango_aprobacion,
+                    )
+                )
+        return norms
@@ -0,0 +1,120 @@
+"""
+Compact sets of pauta ids backed by a Python int.
+
+Bit pauta_id - 1 is set when the pauta is in the set, so set algebra is a
+single integer operation and sizes are popcounts. Any set serializes to 16
+little-endian bytes, enough for 128 pautas.
+"""
+
+from typing import Dict, Iterable, Iterator, Mapping, TypeVar
+
+SET_SIZE = 16  # bytes
+MAX_SET_PAUTA_ID = SET_SIZE * 8
+
+K = TypeVar("K")
+
+
+class PautaSet:
+    """
+    Immutable set of pauta ids.
+
+    Args:
+        ids: Pauta ids between 1 and MAX_SET_PAUTA_ID
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        bits = 0
+        for pauta_id in ids:
+            if not 1 <= pauta_id <= MAX_SET_PAUTA_ID:
+                raise ValueError(f"Pauta id out of range: {pauta_id}")
+            bits |= 1 << (pauta_id - 1)
+        object.__setattr__(self, "bits", bits)
+
+    @classmethod
+    def from_bits(cls, bits: int) -> "PautaSet":
+        if not 0 <= bits < 1 << MAX_SET_PAUTA_ID:
+            raise ValueError(f"Bits out of range for a pauta set: {bits:#x}")
+        pauta_set = cls.__new__(cls)
+        object.__setattr__(pauta_set, "bits", bits)
+        return pauta_set
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PautaSet":
+        """Restore a set serialized with to_bytes"""
+        if len(data) != SET_SIZE:
+            raise ValueError(f"A pauta set takes {SET_SIZE} bytes, got {len(data)}")
+        return cls.from_bits(int.from_bytes(data, "little"))
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes(SET_SIZE, "little")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PautaSet is immutable")
+
+    def __reduce__(self):
+        return (PautaSet.from_bits, (self.bits,))
+
+    def __contains__(self, pauta_id: int) -> bool:
+        return pauta_id >= 1 and (self.bits >> (pauta_id - 1)) & 1 == 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Pauta ids in ascending order"""
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length()
+            bits ^= lowest
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PautaSet):
+            return self.bits == other.bits
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"PautaSet({list(self)})"
+
+    def __or__(self, other: "PautaSet") -> "PautaSet":
+        return PautaSet.from_bits(self.bits | other.bits)
+
+    def __and__(self, other: "PautaSet") -> "PautaSet":
+        return PautaSet.from_bits(self.bits & other.bits)
+
+    def __sub__(self, other: "PautaSet") -> "PautaSet":
+        return PautaSet.from_bits(self.bits & ~other.bits)
+
+    def __xor__(self, other: "PautaSet") -> "PautaSet":
+        return PautaSet.from_bits(self.bits ^ other.bits)
+
+    def __le__(self, other: "PautaSet") -> bool:
+        return self.bits & ~other.bits == 0
+
+    def __ge__(self, other: "PautaSet") -> bool:
+        return other.bits & ~self.bits == 0
+
+    def isdisjoint(self, other: "PautaSet") -> bool:
+        return self.bits & other.bits == 0
+
+    def count_in(self, mask: "PautaSet") -> int:
+        """Number of pautas of this set that are also in mask"""
+        return (self.bits & mask.bits).bit_count()
+
+    def counts_by(self, masks: Mapping[K, "PautaSet"]) -> Dict[K, int]:
+        """
+        Popcount per group, e.g. per area with PautasRepository.area_masks.
+        """
+        bits = self.bits
+        return {key: (bits & mask.bits).bit_count() for key, mask in masks.items()}
+
+
+EMPTY = PautaSet()
@@ -1,57 +1,256 @@
+from array import array
+from bisect import bisect_left
 from decimal import Decimal
-from typing import List, Dict, Optional
-import locale
+from functools import lru_cache
+from typing import List, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple, Union
+import csv
+import hashlib
+import os
+
+from .fixedpoint import exact_hundredths, from_hundredths, to_hundredths
+from .instrumentation import stage, timed
+from .pautaset import PautaSet
+
+# Tabla de normas nacional y nombres de las pautas incluidos con el paquete
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_NORMS_PATH = os.path.join(DATA_DIR, "pautas.csv")
+DEFAULT_NOMBRES_PATH = os.path.join(DATA_DIR, "pautas_nombres.csv")
+NORMS_HEADER = ("numero", "area", "p75", "p90", "tipo_pauta", "rango_aprobacion")
+# Caracteres hexadecimales del hash de contenido que identifica una tabla de normas
+NORM_VERSION_LENGTH = 16
+# Mayor número de pauta que admiten los formatos de tamaño fijo: estadísticas,
+# checkpoints de normas y archivo de evaluaciones
+MAX_PAUTA_ID = 79
+
+# Ventana de evaluación alrededor de la edad del niño (en años y en centésimos)
+EVALUATE_LOWER_WINDOW = Decimal("1.0")
+EVALUATE_UPPER_WINDOW = Decimal("0.5")
+EVALUATE_LOWER_WINDOW_HUNDREDTHS = to_hundredths(EVALUATE_LOWER_WINDOW)
+EVALUATE_UPPER_WINDOW_HUNDREDTHS = to_hundredths(EVALUATE_UPPER_WINDOW)
+
+# Separador del rango de aprobación ("2-4": 2 éxitos de 4 intentos)
+APPROVAL_RANGE_SEPARATOR = "-"
+
+
+class _InternedValue:
+    """
+    Base for small catalog values that are interned by id: constructing the
+    same id twice returns the same object, so values compare by identity.
+    """
 
-# Set locale for formatting
-locale.setlocale(locale.LC_ALL, "es_ES")
+    __slots__ = ("id", "name")
+    _by_id: Dict[int, "_InternedValue"]
+    _by_name: Dict[str, "_InternedValue"]
 
+    def __new__(cls, id: int, name: str):
+        instance = cls._by_id.get(id)
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, "id", id)
+            object.__setattr__(instance, "name", name)
+            cls._by_id[id] = instance
+            cls._by_name[name] = instance
+        elif instance.name != name:
+            raise ValueError(
+                f"{cls.__name__} {id} is already defined as {instance.name!r}"
+            )
+        return instance
 
-class Area:
-    """Represents a developmental area like 'Personal Social' or 'Motor Fino'"""
+    @classmethod
+    def by_id(cls, id: int):
+        """Find an interned value by id"""
+        return cls._by_id.get(id)
 
-    def __init__(self, id: int, name: str):
-        self.id = id
-        self.name = name
+    @classmethod
+    def by_name(cls, name: str):
+        """Find an interned value by name"""
+        return cls._by_name.get(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Unpickling goes through __new__ so the singleton is preserved
+        return (type(self), (self.id, self.name))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.id}, {self.name!r})"
 
     def __str__(self) -> str:
         return self.name
 
 
-class TipoPauta:
+class Area(_InternedValue):
+    """Represents a developmental area like 'Personal Social' or 'Motor Fino'"""
+
+    __slots__ = ()
+    _by_id: Dict[int, "Area"] = {}
+    _by_name: Dict[str, "Area"] = {}
+
+
+class TipoPauta(_InternedValue):
     """Represents the type of guideline/test (Prueba, Pregunta, etc.)"""
 
-    def __init__(self, id: int, name: str):
-        self.id = id
-        self.name = name
+    __slots__ = ()
+    _by_id: Dict[int, "TipoPauta"] = {}
+    _by_name: Dict[str, "TipoPauta"] = {}
+
+
+PERSONAL_SOCIAL = Area(1, "Personal Social")
+MOTOR_FINO = Area(2, "Motor Fino")
+LENGUAJE = Area(3, "Lenguaje")
+MOTOR_GRUESO = Area(4, "Motor Grueso")
+AREAS: Tuple[Area, ...] = (PERSONAL_SOCIAL, MOTOR_FINO, LENGUAJE, MOTOR_GRUESO)
+
+PRUEBA = TipoPauta(1, "Prueba")
+PREGUNTA = TipoPauta(2, "Pregunta")
+PRUEBA_DEMOSTRADA = TipoPauta(3, "Prueba Demostrada")
+TIPOS_PAUTA: Tuple[TipoPauta, ...] = (PRUEBA, PREGUNTA, PRUEBA_DEMOSTRADA)
+
+
+class ApprovalRange(NamedTuple):
+    """Successes required out of the trials administered for a pauta"""
+
+    required: int
+    trials: int
+
+    def passes(self, successes: int) -> bool:
+        """Whether a number of successful trials passes the pauta"""
+        return successes >= self.required
+
+
+# Pautas sin rango de aprobación se registran con un único intento S/N
+SINGLE_TRIAL = ApprovalRange(1, 1)
+
+
+def check_pauta_ids(pauta_ids: Iterable[int]):
+    """
+    Check that pauta ids fit the fixed-size formats, from 1 to MAX_PAUTA_ID.
+
+    Raises:
+        ValueError: If an id is out of range
+    """
+    for pauta_id in pauta_ids:
+        if not 1 <= pauta_id <= MAX_PAUTA_ID:
+            raise ValueError(f"Pauta id out of range 1-{MAX_PAUTA_ID}: {pauta_id}")
+
+
+def region_index(boundaries: Sequence, value) -> int:
+    """
+    Locate a value among sorted boundaries. Region 2i is the open gap before
+    boundary i, region 2i + 1 is the boundary itself and region
+    2 * len(boundaries) is the gap after every boundary, so there are
+    2 * len(boundaries) + 1 regions in all.
+    """
+    index = bisect_left(boundaries, value)
+    if index < len(boundaries) and boundaries[index] == value:
+        return 2 * index + 1
+    return 2 * index
 
-    def __str__(self) -> str:
-        return self.name
+
+@lru_cache(maxsize=None)
+def parse_approval_range(text: str) -> ApprovalRange:
+    """
+    Parse a rango_aprobacion value such as "2-4" (2 successes out of 4 trials).
+    An empty value is a single pass/fail trial.
+
+    Raises:
+        ValueError: If the value is not a valid "required-trials" range
+    """
+    text = text.strip()
+    if not text:
+        return SINGLE_TRIAL
+    required, separator, trials = text.partition(APPROVAL_RANGE_SEPARATOR)
+    if not separator:
+        raise ValueError(f"Invalid approval range: {text!r}")
+    approval = ApprovalRange(int(required), int(trials))
+    if not 1 <= approval.required <= approval.trials:
+        raise ValueError(f"Invalid approval range: {text!r}")
+    return approval
+
+
+@lru_cache(maxsize=None)
+def load_nombres(path: str = DEFAULT_NOMBRES_PATH) -> Dict[int, str]:
+    """Load the display names of the pautas, keyed by pauta id"""
+    with open(path, newline="", encoding="utf-8") as nombres_file:
+        reader = csv.reader(nombres_file)
+        next(reader)  # Skip header
+        return {int(numero): nombre for numero, nombre in reader}
 
 
 class Pauta:
     """
     Represents a developmental milestone with percentile thresholds
     and methods to determine if a measurement falls into certain categories.
+
+    Pautas are immutable. Thresholds are kept both as Decimals for the
+    public API and as integer hundredths (p75_hundredths, p90_hundredths)
+    for the *_hundredths checks used internally. When no name is given it
+    is read from the packaged names table the first time it is needed.
+    The rango_aprobacion text is parsed once into an ApprovalRange.
     """
 
+    __slots__ = (
+        "id",
+        "area",
+        "p75",
+        "p90",
+        "p75_hundredths",
+        "p90_hundredths",
+        "tipo_pauta",
+        "rango_aprobacion",
+        "approval",
+        "_name",
+    )
+
     def __init__(
         self,
         numero: int,
-        nombre: str,
+        nombre: Optional[str],
         area: Area,
         p75: str,
         p90: str,
         tipo_pauta: TipoPauta,
         rango_aprobacion: str,
     ):
-        self.id = numero
-        self.numero = numero
-        self.name = nombre
-        self.area = area
-        self.p75 = Decimal(p75)
-        self.p90 = Decimal(p90)
-        self.tipo_pauta = tipo_pauta
-        self.rango_aprobacion = rango_aprobacion
+        set_attribute = object.__setattr__
+        set_attribute(self, "id", numero)
+        set_attribute(self, "_name", nombre)
+        set_attribute(self, "area", area)
+        set_attribute(self, "p75", Decimal(p75))
+        set_attribute(self, "p90", Decimal(p90))
+        set_attribute(self, "p75_hundredths", to_hundredths(self.p75))
+        set_attribute(self, "p90_hundredths", to_hundredths(self.p90))
+        set_attribute(self, "tipo_pauta", tipo_pauta)
+        set_attribute(self, "rango_aprobacion", rango_aprobacion)
+        set_attribute(self, "approval", parse_approval_range(rango_aprobacion))
+
+    @property
+    def numero(self) -> int:
+        return self.id
+
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            object.__setattr__(self, "_name", load_nombres().get(self.id, ""))
+        return self._name
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Pauta is immutable")
+
+    def __reduce__(self):
+        return (
+            Pauta,
+            (
+                self.id,
+                self._name,
+                self.area,
+                self.p75,
+                self.p90,
+                self.tipo_pauta,
+                self.rango_aprobacion,
+            ),
+        )
 
     def __str__(self) -> str:
         return f"Pauta id: {self.id}. #{self.numero} {self.name} {self.area} P75: {self.p75} P90: {self.p90} Tipo: {self.tipo_pauta} R.Ap: {self.rango_aprobacion}"
@@ -73,21 +272,74 @@ class Pauta:
         Determina si esta pauta debería evaluarse para un niño de la edad dada.
         """
         # No evaluar pautas demasiado básicas (más del 90% de niños ya las dominan hace tiempo)
-        if self.p90 < (age - Decimal("1.0")):
+        if self.p90 < (age - EVALUATE_LOWER_WINDOW):
             return False
 
         # No evaluar pautas demasiado avanzadas (menos del 75% de niños de mayor edad las logran)
-        if self.p75 > (age + Decimal("0.5")):
+        if self.p75 > (age + EVALUATE_UPPER_WINDOW):
             return False
 
         # Esta pauta está en el rango adecuado para evaluar
         return True
 
+    def is_pauta_a_hundredths(self, age: int) -> bool:
+        """is_pauta_a for an age in integer hundredths of a year"""
+        return self.p90_hundredths < age
+
+    def is_pauta_b_hundredths(self, age: int) -> bool:
+        """is_pauta_b for an age in integer hundredths of a year"""
+        return self.p75_hundredths <= age <= self.p90_hundredths
+
+    def should_evaluate_hundredths(self, age: int) -> bool:
+        """should_evaluate for an age in integer hundredths of a year"""
+        return (
+            self.p90_hundredths >= age - EVALUATE_LOWER_WINDOW_HUNDREDTHS
+            and self.p75_hundredths <= age + EVALUATE_UPPER_WINDOW_HUNDREDTHS
+        )
+
+
+class PlanItem(NamedTuple):
+    """A pauta included in a screening plan, with its A/B category for the age"""
+
+    pauta: Pauta
+    is_a: bool
+    is_b: bool
+
+
+class PautaColumns:
+    """
+    Columnar view of a repository: one contiguous array per field, in
+    repository order. Thresholds are stored in integer hundredths of a year;
+    required and trials hold the parsed approval range of each pauta.
+    The arrays support the buffer protocol, so memoryview() or
+    numpy.frombuffer() can read them without copying.
+    """
+
+    __slots__ = ("ids", "areas", "tipos", "p75", "p90", "required", "trials")
+
+    def __init__(self, pautas: List[Pauta]):
+        self.ids = array("H", (pauta.id for pauta in pautas))
+        self.areas = array("B", (pauta.area.id for pauta in pautas))
+        self.tipos = array("B", (pauta.tipo_pauta.id for pauta in pautas))
+        self.p75 = array("H", (pauta.p75_hundredths for pauta in pautas))
+        self.p90 = array("H", (pauta.p90_hundredths for pauta in pautas))
+        self.required = array("B", (pauta.approval.required for pauta in pautas))
+        self.trials = array("B", (pauta.approval.trials for pauta in pautas))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
 
 class PautasRepository:
     """Repository to manage all Pautas (developmental milestones)"""
 
-    def __init__(self):
+    @timed("repository.construction")
+    def __init__(self, norms_path: Optional[str] = None):
+        """
+        Args:
+            norms_path: CSV norm table to load (defaults to the packaged national table)
+        """
+        self.norms_path = norms_path or DEFAULT_NORMS_PATH
         self.pautas: List[Pauta] = []
         self.areas: Dict[str, Area] = {}
         self.tipos_pauta: Dict[str, TipoPauta] = {}
@@ -97,27 +349,29 @@ class PautasRepository:
         # Initialize the tipos_pauta
         self._init_tipos_pauta()
         # Populate the pautas
-        self._populate_pautas()
+        with stage("repository.load"):
+            self._populate_pautas()
+        # Build the columnar view of the thresholds
+        self.columns = PautaColumns(self.pautas)
+        # Identify the norm table by its content
+        self.version = self._content_version()
+        # Build the lookup indexes by id and by area
+        self._build_lookup_indexes()
+        # Build the interval index used by plan_for_age
+        with stage("repository.plan_index"):
+            self._build_plan_index()
+        # The age-bucket plan table is built on first use
+        self._plan_table: Optional[List[Tuple[PlanItem, ...]]] = None
+        self._plan_table_start = 0
 
     def _init_areas(self):
         """Initialize the developmental areas"""
-        areas = [
-            Area(1, "Personal Social"),
-            Area(2, "Motor Fino"),
-            Area(3, "Lenguaje"),
-            Area(4, "Motor Grueso"),
-        ]
-        for area in areas:
+        for area in AREAS:
             self.areas[area.name] = area
 
     def _init_tipos_pauta(self):
         """Initialize the guideline types"""
-        tipos = [
-            TipoPauta(1, "Prueba"),
-            TipoPauta(2, "Pregunta"),
-            TipoPauta(3, "Prueba Demostrada"),
-        ]
-        for tipo in tipos:
+        for tipo in TIPOS_PAUTA:
             self.tipos_pauta[tipo.name] = tipo
 
     def get_area_by_name(self, name: str) -> Optional[Area]:
@@ -129,894 +383,206 @@ class PautasRepository:
         return self.tipos_pauta.get(name)
 
     def _populate_pautas(self):
-        """Populate all the developmental milestones/guidelines"""
-        # Personal Social - already complete
-        self.pautas.append(
-            Pauta(
-                1,
-                "Comunicación con el observador",
-                self.get_area_by_name("Personal Social"),
-                "0.12",
-                "0.27",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                2,
-                "Sonrisa social",
-                self.get_area_by_name("Personal Social"),
-                "0.12",
-                "0.16",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                3,
-                "Actitud frente al espejo",
-                self.get_area_by_name("Personal Social"),
-                "0.39",
-                "0.50",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                4,
-                "Se resiste a que le quiten un juguete",
-                self.get_area_by_name("Personal Social"),
-                "0.55",
-                "0.68",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                5,
-                "Juega a las escondidas",
-                self.get_area_by_name("Personal Social"),
-                "0.55",
-                "0.68",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                6,
-                "Busca objeto",
-                self.get_area_by_name("Personal Social"),
-                "0.76",
-                "0.90",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                7,
-                "Da un objeto",
-                self.get_area_by_name("Personal Social"),
-                "1.08",
-                "1.46",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                8,
-                "Juego simbólico",
-                self.get_area_by_name("Personal Social"),
-                "1.16",
-                "1.52",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                9,
-                "Come solo",
-                self.get_area_by_name("Personal Social"),
-                "1.34",
-                "1.44",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                10,
-                "Ayuda en tareas del hogar",
-                self.get_area_by_name("Personal Social"),
-                "1.25",
-                "1.49",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                11,
-                "Acude al llamado del observador",
-                self.get_area_by_name("Personal Social"),
-                "1.58",
-                "2.35",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                12,
-                "Imita tareas del hogar",
-                self.get_area_by_name("Personal Social"),
-                "1.29",
-                "1.61",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                13,
-                "Se quita ropa o zapatos",
-                self.get_area_by_name("Personal Social"),
-                "2.42",
-                "2.81",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                14,
-                "Se pone ropa o zapatos",
-                self.get_area_by_name("Personal Social"),
-                "2.63",
-                "3.01",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                15,
-                "Control de esfínteres diurno",
-                self.get_area_by_name("Personal Social"),
-                "2.39",
-                "2.71",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                16,
-                "Arma rompecabezas",
-                self.get_area_by_name("Personal Social"),
-                "2.74",
-                "3.17",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                17,
-                "Aparea colores",
-                self.get_area_by_name("Personal Social"),
-                "3.62",
-                "3.80",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "1-4",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                18,
-                "Junta dibujos semejantes",
-                self.get_area_by_name("Personal Social"),
-                "4.74",
-                "5.74",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
+        """Populate all the developmental milestones/guidelines from the norm table"""
+        with open(self.norms_path, newline="", encoding="utf-8") as norms_file:
+            reader = csv.reader(norms_file)
+            next(reader)  # Skip header
+            for numero, area_id, p75, p90, tipo_id, rango in reader:
+                self.pautas.append(
+                    Pauta(
+                        int(numero),
+                        None,
+                        Area.by_id(int(area_id)),
+                        p75,
+                        p90,
+                        TipoPauta.by_id(int(tipo_id)),
+                        rango,
+                    )
+                )
+
+    def _content_version(self) -> str:
+        """
+        Hash the norm table content (not its file), so the same norms give
+        the same version wherever they were loaded from.
+        """
+        digest = hashlib.sha256()
+        for pauta in self.pautas:
+            row = (
+                pauta.id,
+                pauta.area.id,
+                pauta.p75_hundredths,
+                pauta.p90_hundredths,
+                pauta.tipo_pauta.id,
+                pauta.rango_aprobacion,
+            )
+            digest.update(",".join(map(str, row)).encode("utf-8") + b"\n")
+        return digest.hexdigest()[:NORM_VERSION_LENGTH]
+
+    def _build_plan_index(self):
+        """
+        Build an interval index over the evaluation windows of all pautas.
 
-        # Motor Fino - complete the remaining items
-        self.pautas.append(
-            Pauta(
-                19,
-                "Seguimiento visual hasta la línea media",
-                self.get_area_by_name("Motor Fino"),
-                "0.18",
-                "0.21",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                20,
-                "Manos semiabiertas",
-                self.get_area_by_name("Motor Fino"),
-                "0.17",
-                "0.24",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                21,
-                "Mira su mano",
-                self.get_area_by_name("Motor Fino"),
-                "0.26",
-                "0.33",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                22,
-                "Junta manos",
-                self.get_area_by_name("Motor Fino"),
-                "0.34",
-                "0.42",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                23,
-                "Pasa un cubo de mano mirándolo",
-                self.get_area_by_name("Motor Fino"),
-                "0.39",
-                "0.45",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                24,
-                "Prensión cúbito palmar",
-                self.get_area_by_name("Motor Fino"),
-                "0.51",
-                "0.58",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                25,
-                "Prensión pinza superior",
-                self.get_area_by_name("Motor Fino"),
-                "0.87",
-                "0.99",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                26,
-                "Vierte / pasa de botella",
-                self.get_area_by_name("Motor Fino"),
-                "1.27",
-                "1.61",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                27,
-                "Introduce / pasa en botella",
-                self.get_area_by_name("Motor Fino"),
-                "1.21",
-                "1.46",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                28,
-                "Garabatea",
-                self.get_area_by_name("Motor Fino"),
-                "1.26",
-                "1.60",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                29,
-                "Torre de 4 cubos",
-                self.get_area_by_name("Motor Fino"),
-                "1.66",
-                "1.98",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                30,
-                "Torre de 8 cubos",
-                self.get_area_by_name("Motor Fino"),
-                "2.61",
-                "3.12",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                31,
-                "Corrige torre",
-                self.get_area_by_name("Motor Fino"),
-                "3.14",
-                "3.82",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                32,
-                "Imita puente",
-                self.get_area_by_name("Motor Fino"),
-                "3.07",
-                "3.66",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                33,
-                "Dibuja persona en 3 partes",
-                self.get_area_by_name("Motor Fino"),
-                "4.07",
-                "4.80",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                34,
-                "Copia cruz",
-                self.get_area_by_name("Motor Fino"),
-                "4.22",
-                "4.93",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                35,
-                "Dobla un papel en diagonal",
-                self.get_area_by_name("Motor Fino"),
-                "4.48",
-                "4.92",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                36,
-                "Dibuja persona en 6 partes",
-                self.get_area_by_name("Motor Fino"),
-                "4.90",
-                "5.72",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                37,
-                "Copia un triángulo",
-                self.get_area_by_name("Motor Fino"),
-                "5.53",
-                "5.87",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
+        Each pauta is evaluated for ages in [p75 - 0.5, p90 + 1.0]. The sorted
+        window endpoints split the age axis into regions (each endpoint and the
+        open gaps between them) where the set of suitable pautas is constant,
+        so it is computed once per region and found later with a bisect.
+        """
+        # Windows are computed in integer hundredths from the columnar view
+        windows = [
+            (
+                p75 - EVALUATE_UPPER_WINDOW_HUNDREDTHS,
+                p90 + EVALUATE_LOWER_WINDOW_HUNDREDTHS,
             )
-        )
+            for p75, p90 in zip(self.columns.p75, self.columns.p90)
+        ]
+        boundaries = sorted({endpoint for window in windows for endpoint in window})
+        self._plan_boundaries: List[Decimal] = [
+            from_hundredths(boundary) for boundary in boundaries
+        ]
+        self._plan_boundaries_hundredths: List[int] = boundaries
+
+        # Regiones según region_index
+        regions: List[List[Pauta]] = [[] for _ in range(2 * len(boundaries) + 1)]
+        for pauta, (start, end) in zip(self.pautas, windows):
+            first = 2 * bisect_left(boundaries, start) + 1
+            last = 2 * bisect_left(boundaries, end) + 1
+            for region in range(first, last + 1):
+                regions[region].append(pauta)
+        self._plan_regions: List[Tuple[Pauta, ...]] = [
+            tuple(region) for region in regions
+        ]
 
-        # Lenguaje - complete all items
-        self.pautas.append(
-            Pauta(
-                38,
-                "Cocleo palpebral",
-                self.get_area_by_name("Lenguaje"),
-                "0.04",
-                "0.04",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                39,
-                "Busca con la mirada a la madre",
-                self.get_area_by_name("Lenguaje"),
-                "0.47",
-                "0.49",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                40,
-                "Respuesta al no",
-                self.get_area_by_name("Lenguaje"),
-                "0.59",
-                "0.82",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                41,
-                "Silabeo da-da-da ta-ta-ta",
-                self.get_area_by_name("Lenguaje"),
-                "0.60",
-                "0.70",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                42,
-                "Silabeo pa-pama-ma, no específico",
-                self.get_area_by_name("Lenguaje"),
-                "0.69",
-                "0.80",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                43,
-                "papá-mamá específico",
-                self.get_area_by_name("Lenguaje"),
-                "1.36",
-                "1.70",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                44,
-                "Palabra frase",
-                self.get_area_by_name("Lenguaje"),
-                "1.41",
-                "1.89",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                45,
-                "Señala 2 figuras",
-                self.get_area_by_name("Lenguaje"),
-                "1.81",
-                "2.25",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "2-4",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                46,
-                "Tararea en presencia de terceros",
-                self.get_area_by_name("Lenguaje"),
-                "2.56",
-                "2.84",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                47,
-                "Nombra 2 figuras",
-                self.get_area_by_name("Lenguaje"),
-                "2.26",
-                "2.39",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "2-4",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                48,
-                "Frase (sustantivo y verbo)",
-                self.get_area_by_name("Lenguaje"),
-                "2.16",
-                "2.41",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                49,
-                "Dice su nombre completo",
-                self.get_area_by_name("Lenguaje"),
-                "2.81",
-                "3.61",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                50,
-                "Frases completas",
-                self.get_area_by_name("Lenguaje"),
-                "2.63",
-                "3.13",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                51,
-                "Comprende preposiciones",
-                self.get_area_by_name("Lenguaje"),
-                "3.44",
-                "4.49",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "3-4",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                52,
-                "Cumple 2 indicaciones consecutivas",
-                self.get_area_by_name("Lenguaje"),
-                "3.64",
-                "4.61",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                53,
-                "Analogías opuestas",
-                self.get_area_by_name("Lenguaje"),
-                "3.60",
-                "4.28",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "2-3",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                54,
-                "Uso de 2 objetos",
-                self.get_area_by_name("Lenguaje"),
-                "3.81",
-                "4.91",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                55,
-                "Reconoce 3 colores",
-                self.get_area_by_name("Lenguaje"),
-                "4.41",
-                "4.70",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                56,
-                "Sabe por qué es de día o de noche",
-                self.get_area_by_name("Lenguaje"),
-                "4.69",
-                "5.44",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
+    def plan_for_age(self, age: Decimal) -> Tuple[Pauta, ...]:
+        """
+        Return the pautas that should be evaluated for the given age, in
+        repository order. Equivalent to filtering with Pauta.should_evaluate
+        but resolved with a bisect over the precomputed interval index.
+        """
+        return self._plan_regions[region_index(self._plan_boundaries, age)]
 
-        # Motor Grueso - complete all items
-        self.pautas.append(
-            Pauta(
-                57,
-                "Sostén cefálico",
-                self.get_area_by_name("Motor Grueso"),
-                "0.13",
-                "0.21",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                58,
-                "Levanta cabeza 45º",
-                self.get_area_by_name("Motor Grueso"),
-                "0.20",
-                "0.24",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                59,
-                "Posición en línea media",
-                self.get_area_by_name("Motor Grueso"),
-                "0.21",
-                "0.29",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                60,
-                "Desaparición del Moro completo simétrico",
-                self.get_area_by_name("Motor Grueso"),
-                "0.22",
-                "0.23",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                61,
-                "Palanca",
-                self.get_area_by_name("Motor Grueso"),
-                "0.35",
-                "0.41",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                62,
-                "Trípode",
-                self.get_area_by_name("Motor Grueso"),
-                "0.43",
-                "0.49",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                63,
-                "Pasa de posición dorsal a lateral",
-                self.get_area_by_name("Motor Grueso"),
-                "0.46",
-                "0.48",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                64,
-                "Sentado alcanza objeto",
-                self.get_area_by_name("Motor Grueso"),
-                "0.62",
-                "0.75",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                65,
-                "Sentado sin sostén",
-                self.get_area_by_name("Motor Grueso"),
-                "0.59",
-                "0.65",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                66,
-                "Logra pararse",
-                self.get_area_by_name("Motor Grueso"),
-                "0.89",
-                "0.95",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                67,
-                "Camina sujeto a muebles",
-                self.get_area_by_name("Motor Grueso"),
-                "0.88",
-                "0.98",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                68,
-                "Camina de la mano",
-                self.get_area_by_name("Motor Grueso"),
-                "0.94",
-                "1.04",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                69,
-                "Camina solo",
-                self.get_area_by_name("Motor Grueso"),
-                "1.13",
-                "1.25",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                70,
-                "Se agacha y se levanta sin sostén",
-                self.get_area_by_name("Motor Grueso"),
-                "1.12",
-                "1.30",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                71,
-                "Patea pelota",
-                self.get_area_by_name("Motor Grueso"),
-                "1.28",
-                "1.78",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                72,
-                "Sube a una silla o sillón sin ayuda",
-                self.get_area_by_name("Motor Grueso"),
-                "1.35",
-                "1.56",
-                self.get_tipo_pauta_by_name("Pregunta"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                73,
-                "Lanza pelota al examinador",
-                self.get_area_by_name("Motor Grueso"),
-                "1.85",
-                "2.42",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                74,
-                "Salta con ambos pies",
-                self.get_area_by_name("Motor Grueso"),
-                "2.48",
-                "2.83",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                75,
-                "Se para en un pie 5''",
-                self.get_area_by_name("Motor Grueso"),
-                "3.08",
-                "3.80",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                76,
-                "Salto amplio",
-                self.get_area_by_name("Motor Grueso"),
-                "3.03",
-                "3.81",
-                self.get_tipo_pauta_by_name("Prueba"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                77,
-                "Salta en un pie",
-                self.get_area_by_name("Motor Grueso"),
-                "3.95",
-                "4.69",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                78,
-                "Camina talón punta",
-                self.get_area_by_name("Motor Grueso"),
-                "4.36",
-                "5.11",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
-        )
-        self.pautas.append(
-            Pauta(
-                79,
-                "Retrocede talón punta",
-                self.get_area_by_name("Motor Grueso"),
-                "5.28",
-                "5.95",
-                self.get_tipo_pauta_by_name("Prueba Demostrada"),
-                "",
-            )
+    @property
+    def plan_boundaries(self) -> Tuple[Decimal, ...]:
+        """
+        The sorted evaluation window endpoints of all pautas. Between two
+        consecutive endpoints, and on each one, the plan does not change.
+        """
+        return tuple(self._plan_boundaries)
+
+    @timed("repository.plan_table")
+    def _build_plan_table(self):
+        """
+        Precompute the screening plan of every 0.01-year age bucket between
+        the first and last evaluation window endpoints. Plan items are shared
+        between buckets, so the table holds at most three per pauta.
+        """
+        items: Dict[Tuple[int, bool, bool], PlanItem] = {}
+        boundaries = self._plan_boundaries_hundredths
+        first = boundaries[0] if boundaries else 0
+        last = boundaries[-1] if boundaries else -1
+        table: List[Tuple[PlanItem, ...]] = []
+        for age in range(first, last + 1):
+            plan = []
+            for pauta in self.pautas:
+                if not pauta.should_evaluate_hundredths(age):
+                    continue
+                key = (
+                    pauta.id,
+                    pauta.is_pauta_a_hundredths(age),
+                    pauta.is_pauta_b_hundredths(age),
+                )
+                item = items.get(key)
+                if item is None:
+                    item = items[key] = PlanItem(pauta, key[1], key[2])
+                plan.append(item)
+            table.append(tuple(plan))
+        self._plan_table_start = first
+        self._plan_table = table
+
+    def warm(self) -> "PautasRepository":
+        """
+        Build the age-bucket plan table if it is not built yet and return the
+        repository. Call it before sharing the repository across threads or
+        forked processes, so the table is built once.
+        """
+        if self._plan_table is None:
+            self._build_plan_table()
+        return self
+
+    def plan_table(self) -> Tuple[int, Sequence[Tuple[PlanItem, ...]]]:
+        """
+        Return the first age of the plan table in integer hundredths and the
+        screening plan of every 0.01-year bucket from that age on.
+        """
+        self.warm()
+        return self._plan_table_start, self._plan_table
+
+    def screening_plan(self, age: Decimal) -> Tuple[PlanItem, ...]:
+        """
+        Return the pautas to evaluate for the given age together with their
+        A/B categories. Ages on the 0.01-year grid are answered from the
+        precomputed bucket table; other ages fall back to plan_for_age and the
+        scalar category checks.
+        """
+        hundredths = exact_hundredths(age)
+        if hundredths is not None:
+            plan = self.screening_plan_hundredths(hundredths)
+            if plan is not None:
+                return plan
+        return tuple(
+            PlanItem(pauta, pauta.is_pauta_a(age), pauta.is_pauta_b(age))
+            for pauta in self.plan_for_age(age)
         )
 
-    def find_by_area(self, area_name: str) -> List[Pauta]:
-        """Find all pautas for a specific area"""
-        return [pauta for pauta in self.pautas if pauta.area.name == area_name]
+    def screening_plan_hundredths(self, age: int) -> Optional[Tuple[PlanItem, ...]]:
+        """
+        Return the precomputed screening plan for an age in integer
+        hundredths, or None if the age is outside the bucket table.
+        """
+        if self._plan_table is None:
+            self._build_plan_table()
+        index = age - self._plan_table_start
+        if 0 <= index < len(self._plan_table):
+            return self._plan_table[index]
+        return None
+
+    def _build_lookup_indexes(self):
+        """
+        Build the id and per-area indexes used by the find_* methods, and
+        the per-area pauta masks used to count pauta sets by area.
+        """
+        self._pautas_by_id: Dict[int, Pauta] = {
+            pauta.id: pauta for pauta in self.pautas
+        }
+        self._pautas_by_area: Dict[Area, Tuple[Pauta, ...]] = {
+            area: tuple(pauta for pauta in self.pautas if pauta.area is area)
+            for area in AREAS
+        }
+        self.area_masks: Dict[Area, PautaSet] = {
+            area: PautaSet(pauta.id for pauta in pautas)
+            for area, pautas in self._pautas_by_area.items()
+        }
+
+    def find_by_area(self, area: Union[Area, str]) -> Tuple[Pauta, ...]:
+        """Find all pautas for a specific area, given the Area or its name"""
+        if isinstance(area, str):
+            area = self.areas.get(area)
+        return self._pautas_by_area.get(area, ())
 
     def find_by_id(self, id: int) -> Optional[Pauta]:
         """Find a pauta by its id"""
-        for pauta in self.pautas:
-            if pauta.id == id:
-                return pauta
-        return None
+        return self._pautas_by_id.get(id)
+
+
+@lru_cache(maxsize=None)
+def get_shared_repository() -> PautasRepository:
+    """
+    Return a process-wide repository built from the default norm table.
+
+    The instance is built once and must be treated as read-only. Call it in
+    the parent process before forking workers so they inherit the loaded
+    table instead of rebuilding it.
+    """
+    return PautasRepository().warm()
 
 
 # Example usage
@@ -0,0 +1,514 @@
+"""
+Streaming assessment pipeline for bulk and historic data.
+
+Records are read lazily from JSONL or CSV, scored one at a time against the
+shared norm table and written out incrementally, so memory use does not
+depend on the size of the input.
+
+JSONL input, one object per line:
+    {"id": "a1", "birth_date": "2016-01-18", "survey_date": "2019-05-16",
+     "gestational_age_weeks": 38, "answers": {"11": "S", "13": "N"}}
+
+CSV input with a header row; answers are "pauta:S|N" pairs separated by ";":
+    id,birth_date,survey_date,gestational_age_weeks,answers
+    a1,2016-01-18,2019-05-16,38,11:S;13:N
+
+Pautas with several trials (rango_aprobacion) can also be answered with the
+successful trials out of the trials given, e.g. "45": "3/4" or 45:3/4; the
+total must match the pauta's trials. S/N records the examiner's verdict for
+any pauta, while a bare 1/0 is only accepted for single-trial pautas.
+
+Usage:
+    python -m backend.pipeline input.jsonl output.csv [--jobs N] [--norms norms.csv]
+        [--skip-errors]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from datetime import date
+from itertools import islice
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from .child import Child
+from .percetiles import PautasRepository
+from .registry import get_active_repository, get_registry
+from .scoring import Answer, build_plan, parse_answer, score
+from .verdict import score_until_decided
+
+FORMATS = ("jsonl", "csv")
+DEFAULT_CHUNK_SIZE = 2000
+# Chunks in flight per worker process; bounds memory while keeping workers busy
+CHUNKS_IN_FLIGHT_PER_JOB = 2
+CSV_LIST_SEPARATOR = ";"
+CSV_ANSWER_SEPARATOR = ":"
+
+RESULT_FIELDS = (
+    "id",
+    "chronological_age",
+    "corrected_age",
+    "evaluated",
+    "passed",
+    "failed",
+    "failed_a",
+    "failed_b",
+    "missing",
+    "skipped",
+    "passed_screening",
+    "norm_version",
+)
+
+
+class AssessmentRecord(NamedTuple):
+    """A recorded assessment: the child's data and the answer for each pauta"""
+
+    id: Optional[str]
+    birth_date: date
+    survey_date: date
+    gestational_age_weeks: int
+    answers: Dict[int, Answer]
+    line: Optional[int] = None  # Line of the record in its input, for error messages
+
+
+class RecordError(ValueError):
+    """A record that cannot be parsed or scored, with its input line and id"""
+
+    def __init__(
+        self, message: str, line: Optional[int] = None, record_id: Optional[str] = None
+    ):
+        super().__init__(message, line, record_id)
+        self.message = message
+        self.line = line
+        self.record_id = record_id
+
+    def __str__(self) -> str:
+        where = []
+        if self.line is not None:
+            where.append(f"line {self.line}")
+        if self.record_id is not None:
+            where.append(f"id {self.record_id!r}")
+        prefix = f"Record at {', '.join(where)}: " if where else "Record: "
+        return prefix + self.message
+
+
+# Recibe cada registro con errores cuando no se debe abortar la corrida
+ErrorHandler = Callable[[RecordError], None]
+
+
+def _parse_record(
+    line, record_id, birth_date, survey_date, gestational_age_weeks, answers
+) -> AssessmentRecord:
+    record_id = None if record_id in (None, "") else str(record_id)
+    try:
+        return AssessmentRecord(
+            record_id,
+            date.fromisoformat(birth_date),
+            date.fromisoformat(survey_date),
+            int(gestational_age_weeks)
+            if gestational_age_weeks not in (None, "")
+            else 40,
+            {int(pauta_id): parse_answer(value) for pauta_id, value in answers},
+            line,
+        )
+    except (TypeError, ValueError) as error:
+        raise RecordError(str(error), line, record_id) from error
+
+
+def _handle(error: RecordError, on_error: Optional[ErrorHandler]):
+    if on_error is None:
+        raise error
+    on_error(error)
+
+
+def read_jsonl(
+    stream: TextIO, on_error: Optional[ErrorHandler] = None
+) -> Iterator[AssessmentRecord]:
+    """
+    Lazily parse assessment records from a JSONL stream.
+
+    Args:
+        stream: JSONL text stream
+        on_error: Called with each malformed record, which is then skipped
+            (by default the RecordError is raised)
+    """
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            answers = data.get("answers") or {}
+            if not isinstance(answers, dict):
+                raise ValueError("answers must be an object of pauta id -> answer")
+            yield _parse_record(
+                line_number,
+                data.get("id"),
+                data["birth_date"],
+                data["survey_date"],
+                data.get("gestational_age_weeks"),
+                answers.items(),
+            )
+        except RecordError as error:
+            _handle(error, on_error)
+        except KeyError as error:
+            _handle(
+                RecordError(f"Missing field: {error.args[0]}", line_number, data.get("id")),
+                on_error,
+            )
+        except ValueError as error:
+            _handle(RecordError(str(error), line_number), on_error)
+
+
+def read_csv(
+    stream: TextIO, on_error: Optional[ErrorHandler] = None
+) -> Iterator[AssessmentRecord]:
+    """
+    Lazily parse assessment records from a CSV stream with a header row.
+
+    Args:
+        stream: CSV text stream
+        on_error: Called with each malformed record, which is then skipped
+            (by default the RecordError is raised)
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        answers = row.get("answers") or ""
+        try:
+            yield _parse_record(
+                reader.line_num,
+                row.get("id"),
+                row["birth_date"],
+                row["survey_date"],
+                row.get("gestational_age_weeks"),
+                (
+                    pair.split(CSV_ANSWER_SEPARATOR, 1)
+                    for pair in answers.split(CSV_LIST_SEPARATOR)
+                    if pair.strip()
+                ),
+            )
+        except RecordError as error:
+            _handle(error, on_error)
+        except KeyError as error:
+            _handle(
+                RecordError(
+                    f"Missing field: {error.args[0]}", reader.line_num, row.get("id")
+                ),
+                on_error,
+            )
+
+
+def score_record(
+    record: AssessmentRecord,
+    repo: Optional[PautasRepository] = None,
+    stop_early: bool = False,
+) -> Dict[str, object]:
+    """
+    Score one recorded assessment: build the child's plan and compare it
+    with the recorded answers. Answers for pautas outside the plan are ignored.
+    With stop_early, answers are read in decisive order only until the
+    PRUNAPE verdict is decided.
+
+    Raises:
+        RecordError: If an answer is not valid for its pauta
+    """
+    child = Child(record.birth_date, record.survey_date, record.gestational_age_weeks)
+    plan = build_plan(child, repo)
+    try:
+        if stop_early:
+            result = score_until_decided(plan, record.answers)
+        else:
+            result = score(plan, record.answers, ignore_extra=True)
+    except ValueError as error:
+        raise RecordError(str(error), record.line, record.id) from error
+    return {
+        "id": record.id,
+        "chronological_age": str(result.chronological_age),
+        "corrected_age": str(result.corrected_age),
+        "evaluated": list(result.evaluated),
+        "passed": list(result.passed),
+        "failed": list(result.failed),
+        "failed_a": list(result.failed_a),
+        "failed_b": list(result.failed_b),
+        "missing": list(result.missing),
+        "skipped": list(result.skipped),
+        "passed_screening": result.passed_screening,
+        "norm_version": result.norm_version,
+    }
+
+
+def score_records(
+    records: Iterable[AssessmentRecord],
+    repo: Optional[PautasRepository] = None,
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stop_early: bool = False,
+    on_error: Optional[ErrorHandler] = None,
+) -> Iterator[Dict[str, object]]:
+    """
+    Lazily score a stream of records, in input order.
+
+    Args:
+        records: Records to score
+        repo: Repository to score against (defaults to the active norm set)
+        jobs: Number of worker processes (1 scores in the current process,
+            0 or None uses one process per CPU)
+        chunk_size: Records sent to a worker at a time when jobs > 1
+        stop_early: Stop reading answers once the verdict is decided
+        on_error: Called with each record that cannot be scored, which is then
+            skipped (by default the RecordError is raised)
+    """
+    repo = repo or get_active_repository()
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1:
+        for record in records:
+            try:
+                yield score_record(record, repo, stop_early)
+            except RecordError as error:
+                _handle(error, on_error)
+        return
+    for result in _score_records_parallel(records, repo, jobs, chunk_size, stop_early):
+        if isinstance(result, RecordError):
+            _handle(result, on_error)
+        else:
+            yield result
+
+
+# Settings of worker processes, set once per worker by _init_worker
+_worker_repo: Optional[PautasRepository] = None
+_worker_stop_early = False
+
+
+def _init_worker(repo: PautasRepository, stop_early: bool):
+    global _worker_repo, _worker_stop_early
+    _worker_repo = repo
+    _worker_stop_early = stop_early
+
+
+def _score_chunk(
+    chunk: List[AssessmentRecord],
+) -> List[Union[Dict[str, object], RecordError]]:
+    # Los errores vuelven al proceso padre, que decide si abortar u omitir el registro
+    results: List[Union[Dict[str, object], RecordError]] = []
+    for record in chunk:
+        try:
+            results.append(score_record(record, _worker_repo, _worker_stop_early))
+        except RecordError as error:
+            results.append(error)
+    return results
+
+
+def _chunked(
+    records: Iterable[AssessmentRecord], chunk_size: int
+) -> Iterator[List[AssessmentRecord]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _score_records_parallel(
+    records: Iterable[AssessmentRecord],
+    repo: PautasRepository,
+    jobs: int,
+    chunk_size: int,
+    stop_early: bool = False,
+) -> Iterator[Union[Dict[str, object], RecordError]]:
+    """
+    Score chunks of records in a process pool and yield results in input order.
+    Records that cannot be scored are yielded as their RecordError.
+
+    The repository is handed to each worker once through the pool
+    initializer. With the fork start method it is inherited from the parent
+    without pickling, so the plan table warmed here is shared copy-on-write.
+    Only a bounded number of chunks is in flight at any time.
+    """
+    repo.warm()  # Construir la tabla de planes antes de hacer fork
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    max_pending = jobs * CHUNKS_IN_FLIGHT_PER_JOB
+    with context.Pool(jobs, initializer=_init_worker, initargs=(repo, stop_early)) as pool:
+        pending = deque()
+        for chunk in _chunked(records, chunk_size):
+            pending.append(pool.apply_async(_score_chunk, (chunk,)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def write_jsonl(results: Iterable[Dict[str, object]], stream: TextIO) -> int:
+    """Write results as JSONL as they are produced. Returns the number written."""
+    count = 0
+    for result in results:
+        stream.write(json.dumps(result, ensure_ascii=False))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(results: Iterable[Dict[str, object]], stream: TextIO) -> int:
+    """Write results as CSV as they are produced. Returns the number written."""
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(RESULT_FIELDS)
+    count = 0
+    for result in results:
+        writer.writerow(
+            [
+                CSV_LIST_SEPARATOR.join(map(str, value))
+                if isinstance(value, list)
+                else ("" if value is None else value)
+                for value in (result[field] for field in RESULT_FIELDS)
+            ]
+        )
+        count += 1
+    return count
+
+
+_READERS = {"jsonl": read_jsonl, "csv": read_csv}
+_WRITERS = {"jsonl": write_jsonl, "csv": write_csv}
+
+
+def detect_format(path: str) -> str:
+    """Guess the record format from a file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot detect the format of {path!r}; use jsonl or csv")
+    return extension
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    repo: Optional[PautasRepository] = None,
+    jobs: int = 1,
+    stop_early: bool = False,
+    on_error: Optional[ErrorHandler] = None,
+) -> int:
+    """
+    Score every record of an input file and write the results to an output file.
+
+    Args:
+        input_path: JSONL or CSV file with assessment records ("-" for stdin)
+        output_path: JSONL or CSV file for the results ("-" for stdout)
+        input_format: "jsonl" or "csv" (detected from the extension by default)
+        output_format: "jsonl" or "csv" (detected from the extension by default)
+        repo: Repository to score against (defaults to the active norm set)
+        jobs: Number of worker processes (0 uses one per CPU)
+        stop_early: Stop reading answers once the verdict is decided
+        on_error: Called with each record that cannot be parsed or scored,
+            which is then skipped (by default the RecordError is raised)
+
+    Returns:
+        The number of records scored
+    """
+    input_format = input_format or detect_format(input_path)
+    output_format = output_format or detect_format(output_path)
+    source = (
+        sys.stdin
+        if input_path == "-"
+        else open(input_path, newline="", encoding="utf-8")
+    )
+    target = (
+        sys.stdout
+        if output_path == "-"
+        else open(output_path, "w", newline="", encoding="utf-8")
+    )
+    try:
+        records = _READERS[input_format](source, on_error)
+        results = score_records(
+            records, repo, jobs=jobs, stop_early=stop_early, on_error=on_error
+        )
+        return _WRITERS[output_format](results, target)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Puntúa evaluaciones PRUNAPE en lote desde JSONL o CSV"
+    )
+    parser.add_argument("input", help="archivo de entrada (.jsonl o .csv, - para stdin)")
+    parser.add_argument("output", help="archivo de salida (.jsonl o .csv, - para stdout)")
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="procesos de trabajo (0 = uno por CPU, por defecto 1)",
+    )
+    parser.add_argument(
+        "--stop-early",
+        action="store_true",
+        help="dejar de leer respuestas cuando el resultado PRUNAPE ya está decidido",
+    )
+    parser.add_argument(
+        "--norms",
+        help="tabla de normas CSV a usar en lugar de la nacional (p. ej. una regional)",
+    )
+    parser.add_argument(
+        "--skip-errors",
+        action="store_true",
+        help="omitir los registros con errores (informados en stderr) en lugar de abortar",
+    )
+    args = parser.parse_args(argv)
+    # Solo se cuentan: guardar los errores haría crecer la memoria con la entrada
+    skipped = 0
+
+    def report(error: RecordError):
+        nonlocal skipped
+        skipped += 1
+        print(f"Registro omitido: {error}", file=sys.stderr)
+
+    repo = None
+    if args.norms:
+        registry = get_registry()
+        repo = registry.get(registry.load(args.norms))
+    try:
+        run(
+            args.input,
+            args.output,
+            args.input_format,
+            args.output_format,
+            repo,
+            jobs=args.jobs,
+            stop_early=args.stop_early,
+            on_error=report if args.skip_errors else None,
+        )
+    except RecordError as error:
+        print(f"Error: {error} (use --skip-errors para omitirlo)", file=sys.stderr)
+        return 1
+    if skipped:
+        print(f"{skipped} registro(s) omitido(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Registry of norm sets: the national table plus any regional re-estimations.
+
+Each norm set is an immutable PautasRepository snapshot identified by the
+hash of its content (PautasRepository.version). Snapshots share the interned
+Area and TipoPauta objects. Switching the active set replaces a single
+reference, so readers never take a lock and never see a half-loaded table:
+a reader that already holds a snapshot keeps using it until it asks again.
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+from .percetiles import PautasRepository, get_shared_repository
+
+# Nombre con el que se registra la tabla de normas nacional incluida en el paquete
+NATIONAL_NORM_SET = "nacional"
+
+
+class NormSetRegistry:
+    """
+    Holds norm set snapshots by version and name, and the active one.
+
+    Writers (add, load, activate) are serialized by a lock and publish new
+    lookup dicts instead of mutating the ones readers may be using.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, PautasRepository] = {}
+        self._names: Dict[str, str] = {}
+        self._active: Optional[PautasRepository] = None
+
+    def add(self, repo: PautasRepository, name: Optional[str] = None) -> str:
+        """
+        Register a fully loaded repository and return its version. It must
+        not be modified afterwards. Registering the same content twice keeps
+        the first snapshot.
+
+        Args:
+            repo: Repository to register
+            name: Optional name to refer to it, e.g. a region
+        """
+        # Construir la tabla de planes antes de publicar el snapshot
+        repo.warm()
+        with self._lock:
+            if repo.version not in self._snapshots:
+                snapshots = dict(self._snapshots)
+                snapshots[repo.version] = repo
+                self._snapshots = snapshots
+            if name is not None:
+                names = dict(self._names)
+                names[name] = repo.version
+                self._names = names
+        return repo.version
+
+    def load(self, norms_path: str, name: Optional[str] = None) -> str:
+        """Load a CSV norm table, register it and return its version"""
+        return self.add(PautasRepository(norms_path), name)
+
+    def get(self, key: str) -> PautasRepository:
+        """
+        Return the snapshot with the given version or name.
+
+        Raises:
+            KeyError: If no norm set has that version or name
+        """
+        snapshots = self._snapshots
+        repo = snapshots.get(self._names.get(key, key))
+        if repo is None:
+            raise KeyError(f"Unknown norm set: {key!r}")
+        return repo
+
+    def activate(self, key: str) -> PautasRepository:
+        """Make the norm set with the given version or name the active one"""
+        with self._lock:
+            repo = self.get(key)
+            self._active = repo
+        return repo
+
+    @property
+    def active(self) -> PautasRepository:
+        """
+        The active snapshot.
+
+        Raises:
+            LookupError: If no norm set was activated
+        """
+        repo = self._active
+        if repo is None:
+            raise LookupError("No active norm set")
+        return repo
+
+    def versions(self) -> Dict[str, str]:
+        """Registered names and their versions"""
+        return dict(self._names)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._snapshots or key in self._names
+
+
+@lru_cache(maxsize=None)
+def get_registry() -> NormSetRegistry:
+    """
+    Return the process-wide registry, with the national norm table
+    registered and active. Like get_shared_repository, call it before
+    forking workers so they inherit the loaded snapshots.
+    """
+    registry = NormSetRegistry()
+    registry.add(get_shared_repository(), NATIONAL_NORM_SET)
+    registry.activate(NATIONAL_NORM_SET)
+    return registry
+
+
+def get_active_repository() -> PautasRepository:
+    """Return the active snapshot of the process-wide registry"""
+    return get_registry().active
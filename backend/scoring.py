@@ -0,0 +1,284 @@
+from decimal import Decimal
+from typing import Mapping, NamedTuple, Optional, Tuple, Union
+
+from .child import Child
+from .fixedpoint import from_hundredths
+from .pautaset import PautaSet
+from .percetiles import (
+    Area,
+    Pauta,
+    PautasRepository,
+    PlanItem,
+)
+from .registry import get_active_repository
+
+# Reglas PRUNAPE: una pauta A fallada o dos pautas B falladas no pasan la prueba
+FAILED_A_LIMIT = 1
+FAILED_B_LIMIT = 2
+
+# Respuestas registradas: S/N y sinónimos, o intentos logrados "3/4"
+TRIALS_SEPARATOR = "/"
+_PASS_VALUES = {"S", "SI", "SÍ", "P", "PASA", "PASS", "TRUE"}
+_FAIL_VALUES = {"N", "NO", "F", "FALLA", "FAIL", "FALSE"}
+
+
+class TrialCount(NamedTuple):
+    """Successful trials out of the trials given for a pauta, e.g. 3 of 4"""
+
+    successes: int
+    trials: int
+
+
+# S/N (bool), intentos logrados sobre los dados (TrialCount) o 0/1 (int)
+Answer = Union[bool, int, TrialCount]
+
+
+class AssessmentPlan(NamedTuple):
+    """The pautas to administer to a child, with their A/B categories"""
+
+    chronological_age: Decimal
+    corrected_age: Decimal
+    items: Tuple[PlanItem, ...]
+    norm_version: str
+    area_masks: Mapping[Area, PautaSet]  # From the repository the plan was built with
+
+    @property
+    def pauta_ids(self) -> Tuple[int, ...]:
+        return tuple(item.pauta.id for item in self.items)
+
+    @property
+    def eligible(self) -> PautaSet:
+        """The pautas of the plan"""
+        return PautaSet(item.pauta.id for item in self.items)
+
+    @property
+    def category_a(self) -> PautaSet:
+        return PautaSet(item.pauta.id for item in self.items if item.is_a)
+
+    @property
+    def category_b(self) -> PautaSet:
+        return PautaSet(item.pauta.id for item in self.items if item.is_b)
+
+
+class AreaSummary(NamedTuple):
+    """Per-area counts of an assessment"""
+
+    area: Area
+    evaluated: int  # Pautas del área con respuesta: passed + failed
+    passed: int
+    failed: int
+
+
+class AssessmentResult(NamedTuple):
+    """Outcome of scoring the answers of an assessment against its plan"""
+
+    chronological_age: Decimal
+    corrected_age: Decimal
+    # Pautas del plan con respuesta, en orden del plan; las demás quedan en
+    # missing (o skipped)
+    evaluated: Tuple[int, ...]
+    passed: Tuple[int, ...]
+    failed: Tuple[int, ...]
+    failed_a: Tuple[int, ...]
+    failed_b: Tuple[int, ...]
+    missing: Tuple[int, ...]
+    areas: Tuple[AreaSummary, ...]
+    passed_screening: bool
+    norm_version: str
+    # Respuestas registradas que no se leyeron porque el veredicto ya estaba decidido
+    skipped: Tuple[int, ...] = ()
+
+    @property
+    def passed_set(self) -> PautaSet:
+        return PautaSet(self.passed)
+
+    @property
+    def failed_set(self) -> PautaSet:
+        return PautaSet(self.failed)
+
+    @property
+    def failed_a_set(self) -> PautaSet:
+        return PautaSet(self.failed_a)
+
+    @property
+    def failed_b_set(self) -> PautaSet:
+        return PautaSet(self.failed_b)
+
+    @property
+    def missing_set(self) -> PautaSet:
+        return PautaSet(self.missing)
+
+
+def build_plan(child: Child, repo: Optional[PautasRepository] = None) -> AssessmentPlan:
+    """
+    Build the screening plan for a child from their corrected age.
+
+    Args:
+        child: The child to assess
+        repo: Repository to plan against (defaults to the active norm set)
+    """
+    repo = repo or get_active_repository()
+    age = child.corrected_age_hundredths()
+    items = repo.screening_plan_hundredths(age)
+    if items is None:
+        items = repo.screening_plan(from_hundredths(age))
+    return AssessmentPlan(
+        from_hundredths(child.age_hundredths()),
+        from_hundredths(age),
+        items,
+        repo.version,
+        repo.area_masks,
+    )
+
+
+def is_screening_passed(failed_a: int, failed_b: int) -> bool:
+    """Apply the PRUNAPE verdict to the number of failed A and B pautas"""
+    return failed_a < FAILED_A_LIMIT and failed_b < FAILED_B_LIMIT
+
+
+def answer_passes(pauta: Pauta, answer: Answer) -> bool:
+    """
+    Whether an answer passes a pauta.
+
+    A bool is the examiner's pass/fail verdict and is taken as is for any
+    pauta. A TrialCount is checked against the pauta's approval range and
+    must report as many trials as the pauta has. A bare int is only accepted
+    for single-trial pautas, as 1 (pass) or 0 (fail): for pautas with several
+    trials it is ambiguous and must be given as a TrialCount.
+
+    Raises:
+        ValueError: If the answer is not one of the above or does not match
+            the pauta's trials
+    """
+    if answer is True or answer is False:
+        return answer
+    approval = pauta.approval
+    if isinstance(answer, TrialCount):
+        successes, trials = answer
+        if trials != approval.trials or not 0 <= successes <= trials:
+            raise ValueError(
+                f"Answer for pauta {pauta.id} must count successes out of"
+                f" {approval.trials} trials: {successes}/{trials}"
+            )
+        return approval.passes(successes)
+    if not isinstance(answer, int):
+        raise ValueError(
+            f"Answer for pauta {pauta.id} must be a bool or a trial count: {answer!r}"
+        )
+    if approval.trials != 1:
+        raise ValueError(
+            f"Answer for pauta {pauta.id} must be S/N or successes out of"
+            f" {approval.trials} trials (e.g. {approval.required}/{approval.trials}),"
+            f" not a bare number: {answer!r}"
+        )
+    if answer not in (0, 1):
+        raise ValueError(f"Answer for pauta {pauta.id} must be 0 or 1: {answer!r}")
+    return answer == 1
+
+
+def parse_answer(value) -> Answer:
+    """
+    Parse a recorded answer: S/N or true/false into pass (True) or fail
+    (False), 1/0 into the int 1 or 0 and a trial count such as "3/4" into a
+    TrialCount. Whether the answer suits its pauta is checked by
+    answer_passes.
+
+    Raises:
+        ValueError: If the value is not a recognized answer
+    """
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().upper()
+    if normalized in _PASS_VALUES:
+        return True
+    if normalized in _FAIL_VALUES:
+        return False
+    if normalized in ("0", "1"):
+        return int(normalized)
+    successes, separator, trials = normalized.partition(TRIALS_SEPARATOR)
+    if separator and successes.isdigit() and trials.isdigit():
+        if int(successes) <= int(trials):
+            return TrialCount(int(successes), int(trials))
+    raise ValueError(f"Unrecognized answer: {value!r}")
+
+
+def score(
+    plan: AssessmentPlan,
+    answers: Mapping[int, Answer],
+    ignore_extra: bool = False,
+) -> AssessmentResult:
+    """
+    Score the answers given for a plan. Only answered pautas are evaluated;
+    pautas of the plan without an answer are reported as missing and do not
+    count towards the verdict.
+
+    Args:
+        plan: Plan built with build_plan
+        answers: For each administered pauta id, an answer as accepted by
+            answer_passes: pass (True) or fail (False), or a TrialCount that
+            passes when its successes reach the pauta's approval range
+        ignore_extra: Ignore answers for pautas outside the plan instead of failing
+
+    Raises:
+        ValueError: If an answer is not valid for its pauta (see
+            answer_passes), or targets a pauta outside the plan and
+            ignore_extra is False
+    """
+    plan_ids = set()
+    evaluated = []
+    passed = []
+    failed = []
+    failed_a = []
+    failed_b = []
+    missing = []
+    # Conjuntos de bits para los resúmenes por área
+    passed_bits = 0
+    failed_bits = 0
+    for pauta, is_a, is_b in plan.items:
+        plan_ids.add(pauta.id)
+        answer = answers.get(pauta.id)
+        if answer is None:
+            missing.append(pauta.id)
+        else:
+            evaluated.append(pauta.id)
+            bit = 1 << (pauta.id - 1)
+            if answer is not True and answer is not False:
+                answer = answer_passes(pauta, answer)
+            if answer:
+                passed.append(pauta.id)
+                passed_bits |= bit
+            else:
+                failed.append(pauta.id)
+                failed_bits |= bit
+                if is_a:
+                    failed_a.append(pauta.id)
+                elif is_b:
+                    failed_b.append(pauta.id)
+
+    evaluated_bits = passed_bits | failed_bits
+    if not ignore_extra:
+        extra = [pauta_id for pauta_id in answers if pauta_id not in plan_ids]
+        if extra:
+            raise ValueError(f"Answers for pautas outside the plan: {sorted(extra)}")
+
+    return AssessmentResult(
+        plan.chronological_age,
+        plan.corrected_age,
+        tuple(evaluated),
+        tuple(passed),
+        tuple(failed),
+        tuple(failed_a),
+        tuple(failed_b),
+        tuple(missing),
+        tuple(
+            AreaSummary(
+                area,
+                (evaluated_bits & mask.bits).bit_count(),
+                (passed_bits & mask.bits).bit_count(),
+                (failed_bits & mask.bits).bit_count(),
+            )
+            for area, mask in plan.area_masks.items()
+        ),
+        is_screening_passed(len(failed_a), len(failed_b)),
+        plan.norm_version,
+    )
@@ -0,0 +1,365 @@
+"""
+Asyncio HTTP/JSON service for screening plans and scoring (stdlib only).
+
+Endpoints (POST, JSON body):
+    /plan   {"birth_date": "2016-01-18", "survey_date": "2019-05-16",
+             "gestational_age_weeks": 38}
+    /score  same fields plus "answers": {"11": "S", "13": "N", "45": "3/4"}
+
+Usage:
+    python -m backend.server [--host 127.0.0.1] [--port 8080] [--workers N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from .child import Child
+from .percetiles import PautasRepository
+from .registry import get_active_repository, get_registry
+from .scoring import (
+    Answer,
+    AssessmentPlan,
+    AssessmentResult,
+    build_plan,
+    parse_answer,
+    score,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BATCH_SIZE = 256
+MAX_BODY_SIZE = 64 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class RequestError(Exception):
+    """A client error reported with an HTTP status and a message"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_child(payload: Dict) -> Child:
+    """Build a Child from the fields of a request body"""
+    try:
+        birth_date = date.fromisoformat(payload["birth_date"])
+        survey_date = (
+            date.fromisoformat(payload["survey_date"])
+            if payload.get("survey_date")
+            else None
+        )
+        gestational_age_weeks = int(payload.get("gestational_age_weeks", 40))
+    except KeyError as error:
+        raise RequestError(400, f"Missing field: {error.args[0]}")
+    except (TypeError, ValueError) as error:
+        raise RequestError(400, str(error))
+    return Child(birth_date, survey_date, gestational_age_weeks)
+
+
+def parse_answers(payload: Dict) -> Dict[int, Answer]:
+    """Parse the answers of a /score request body"""
+    answers = payload.get("answers")
+    if not isinstance(answers, dict):
+        raise RequestError(400, "answers must be an object of pauta id -> S/N or successes/trials")
+    try:
+        return {int(pauta_id): parse_answer(value) for pauta_id, value in answers.items()}
+    except ValueError as error:
+        raise RequestError(400, str(error))
+
+
+def plan_to_json(plan: AssessmentPlan) -> Dict:
+    return {
+        "chronological_age": str(plan.chronological_age),
+        "corrected_age": str(plan.corrected_age),
+        "norm_version": plan.norm_version,
+        "pautas": [
+            {
+                "id": pauta.id,
+                "name": pauta.name,
+                "area": pauta.area.name,
+                "tipo_pauta": pauta.tipo_pauta.name,
+                "required": pauta.approval.required,
+                "trials": pauta.approval.trials,
+                "is_a": is_a,
+                "is_b": is_b,
+            }
+            for pauta, is_a, is_b in plan.items
+        ],
+    }
+
+
+def result_to_json(result: AssessmentResult) -> Dict:
+    return {
+        "chronological_age": str(result.chronological_age),
+        "corrected_age": str(result.corrected_age),
+        "evaluated": list(result.evaluated),
+        "passed": list(result.passed),
+        "failed": list(result.failed),
+        "failed_a": list(result.failed_a),
+        "failed_b": list(result.failed_b),
+        "missing": list(result.missing),
+        "skipped": list(result.skipped),
+        "areas": [
+            {
+                "area": summary.area.name,
+                "evaluated": summary.evaluated,
+                "passed": summary.passed,
+                "failed": summary.failed,
+            }
+            for summary in result.areas
+        ],
+        "passed_screening": result.passed_screening,
+        "norm_version": result.norm_version,
+    }
+
+
+def handle_plan(payload: Dict, repo: PautasRepository) -> Dict:
+    return plan_to_json(build_plan(parse_child(payload), repo))
+
+
+def handle_score(payload: Dict, repo: PautasRepository) -> Dict:
+    plan = build_plan(parse_child(payload), repo)
+    try:
+        result = score(plan, parse_answers(payload))
+    except ValueError as error:
+        raise RequestError(400, str(error))
+    return result_to_json(result)
+
+
+ROUTES = {"/plan": handle_plan, "/score": handle_score}
+
+
+class RequestBatcher:
+    """
+    Collects the requests that arrive during one event loop iteration and
+    runs their handlers one after another in a single callback. The batch
+    resolves the active norm set once, so all of its requests are answered
+    with the same snapshot even if another set is activated meanwhile, and
+    the loop schedules one callback per batch rather than one per request.
+    """
+
+    def __init__(
+        self, repo: Optional[PautasRepository], max_batch_size: int = MAX_BATCH_SIZE
+    ):
+        # Sin repositorio fijo, cada lote usa el conjunto de normas activo
+        self.repo = repo
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._scheduled = False
+
+    def submit(self, path: str, payload: Dict) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((path, payload, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        self._scheduled = False
+        batch, self._pending = self._pending, []
+        repo = self.repo or get_active_repository()
+        for path, payload, future in batch:
+            if future.cancelled():
+                continue
+            try:
+                future.set_result(ROUTES[path](payload, repo))
+            except Exception as error:  # Reported to the waiting connection
+                future.set_exception(error)
+
+
+class PrunapeServer:
+    """HTTP/1.1 server with keep-alive, serving ROUTES through a RequestBatcher"""
+
+    def __init__(self, repo: Optional[PautasRepository] = None):
+        # Build the norm table and plan table once, at startup; without a
+        # fixed repository requests follow the registry's active norm set
+        get_registry()
+        self.repo = repo
+        self.batcher = RequestBatcher(self.repo)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                keep_alive = await self._handle_request(reader, writer)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline excede el límite del stream con líneas demasiado largas
+            try:
+                await self._respond(writer, 400, {"error": "Line too long"}, False)
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+            return False
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = (
+            connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        )
+
+        content_length = headers.get("content-length") or "0"
+        if not content_length.isdigit():
+            await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+            return False
+        length = int(content_length)
+        if length > MAX_BODY_SIZE:
+            await self._respond(writer, 413, {"error": "Body too large"}, False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+
+        path = target.split("?", 1)[0]
+        if path not in ROUTES:
+            status, response = 404, {"error": f"Unknown path: {path}"}
+        elif method != "POST":
+            status, response = 405, {"error": "Use POST"}
+        else:
+            status, response = await self._dispatch(path, body)
+        await self._respond(writer, status, response, keep_alive)
+        return keep_alive
+
+    async def _dispatch(self, path: str, body: bytes) -> Tuple[int, Dict]:
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise RequestError(400, "Body must be a JSON object")
+            return 200, await self.batcher.submit(path, payload)
+        except json.JSONDecodeError as error:
+            return 400, {"error": f"Invalid JSON: {error}"}
+        except RequestError as error:
+            return error.status, {"error": str(error)}
+        except Exception as error:
+            return 500, {"error": repr(error)}
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool
+    ):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, sock: socket.socket):
+        server = await asyncio.start_server(self.handle_connection, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(socket.SOMAXCONN)
+    sock.setblocking(False)
+    return sock
+
+
+def _run_worker(sock: socket.socket):
+    try:
+        asyncio.run(PrunapeServer().serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 1):
+    """
+    Run the service until interrupted.
+
+    With workers > 1 the listening socket is opened and the norm table is
+    built in the parent, then the process forks that many workers which
+    inherit both and accept connections from the shared socket.
+    """
+    sock = _listen(host, port)
+    get_registry()
+    print(f"Escuchando en http://{host}:{port} con {workers} proceso(s)", flush=True)
+    if workers <= 1:
+        _run_worker(sock)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            _run_worker(sock)
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for child in children:
+        os.waitpid(child, 0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Servicio HTTP de planes y puntuación PRUNAPE"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="procesos pre-fork (por defecto 1)"
+    )
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
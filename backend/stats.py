@@ -0,0 +1,179 @@
+"""
+Streaming population statistics per pauta and corrected-age band.
+
+Counters live in one fixed-size array indexed by (pauta id, age band,
+counter), so memory does not depend on the number of assessments. Two
+aggregators with the same layout can be merged, which lets shards and worker
+processes aggregate independently, and the counters can be checkpointed to
+disk and resumed.
+"""
+
+import struct
+from array import array
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from .checkpoint import load_arrays, save_arrays
+from .fixedpoint import to_hundredths
+from .percetiles import (
+    AREAS,
+    MAX_PAUTA_ID,
+    Area,
+    PautasRepository,
+    check_pauta_ids,
+    get_shared_repository,
+)
+from .scoring import AssessmentResult
+
+BAND_WIDTH = 10  # 0.1 years, in hundredths
+BANDS = 80  # 0.0-7.9 years; younger and older ages go to the first and last band
+
+# Contadores por (pauta, banda)
+EVALUATED = 0
+PASSED = 1
+FAILED = 2
+FAILED_A = 3
+FAILED_B = 4
+COUNTERS = 5
+
+_CHECKPOINT_MAGIC = b"PRNSTAT1"
+_CHECKPOINT_HEADER = struct.Struct("<8sIII")  # magic, pautas, bands, counters
+
+
+class PautaBandStats(NamedTuple):
+    pauta_id: int
+    band: int
+    evaluated: int
+    passed: int
+    failed: int
+    failed_a: int
+    failed_b: int
+
+    @property
+    def band_start(self) -> float:
+        """Lower corrected age of the band, in years"""
+        return self.band * BAND_WIDTH / 100
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        answered = self.passed + self.failed
+        return self.passed / answered if answered else None
+
+
+def age_band(age_hundredths: int) -> int:
+    """Band of a corrected age in hundredths, clamped to [0, BANDS)"""
+    band = age_hundredths // BAND_WIDTH
+    if band < 0:
+        return 0
+    if band >= BANDS:
+        return BANDS - 1
+    return band
+
+
+class PopulationStats:
+    """Online aggregator of assessment results per pauta and age band"""
+
+    def __init__(self):
+        size = (MAX_PAUTA_ID + 1) * BANDS * COUNTERS
+        self.counters = array("Q", bytes(8 * size))
+        self.assessments = array("Q", bytes(8 * BANDS))
+        self.screenings_failed = array("Q", bytes(8 * BANDS))
+
+    @staticmethod
+    def _offset(pauta_id: int, band: int) -> int:
+        return (pauta_id * BANDS + band) * COUNTERS
+
+    def add(self, result: AssessmentResult):
+        """
+        Count one scored assessment.
+
+        Raises:
+            ValueError: If a pauta id is above MAX_PAUTA_ID
+        """
+        check_pauta_ids(result.evaluated)
+        band = age_band(to_hundredths(result.corrected_age))
+        counters = self.counters
+        self.assessments[band] += 1
+        if not result.passed_screening:
+            self.screenings_failed[band] += 1
+        for pauta_id in result.evaluated:
+            counters[self._offset(pauta_id, band) + EVALUATED] += 1
+        for pauta_id in result.passed:
+            counters[self._offset(pauta_id, band) + PASSED] += 1
+        for pauta_id in result.failed:
+            counters[self._offset(pauta_id, band) + FAILED] += 1
+        for pauta_id in result.failed_a:
+            counters[self._offset(pauta_id, band) + FAILED_A] += 1
+        for pauta_id in result.failed_b:
+            counters[self._offset(pauta_id, band) + FAILED_B] += 1
+
+    def add_all(self, results: Iterable[AssessmentResult]) -> "PopulationStats":
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other: "PopulationStats") -> "PopulationStats":
+        """Add the counters of another aggregator into this one"""
+        for mine, theirs in (
+            (self.counters, other.counters),
+            (self.assessments, other.assessments),
+            (self.screenings_failed, other.screenings_failed),
+        ):
+            for index, value in enumerate(theirs):
+                if value:
+                    mine[index] += value
+        return self
+
+    def save(self, path: str):
+        """Checkpoint the counters to a binary file, replacing it atomically"""
+        save_arrays(
+            path,
+            _CHECKPOINT_HEADER.pack(_CHECKPOINT_MAGIC, MAX_PAUTA_ID + 1, BANDS, COUNTERS),
+            (self.counters, self.assessments, self.screenings_failed),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PopulationStats":
+        """Restore counters saved with save"""
+        stats = cls()
+        with open(path, "rb") as checkpoint:
+            magic, pautas, bands, counters = _CHECKPOINT_HEADER.unpack(
+                checkpoint.read(_CHECKPOINT_HEADER.size)
+            )
+            if magic != _CHECKPOINT_MAGIC or (pautas, bands, counters) != (
+                MAX_PAUTA_ID + 1,
+                BANDS,
+                COUNTERS,
+            ):
+                raise ValueError(f"{path} is not a compatible statistics checkpoint")
+            load_arrays(
+                checkpoint, (stats.counters, stats.assessments, stats.screenings_failed)
+            )
+        return stats
+
+    def pauta_bands(self) -> Iterator[PautaBandStats]:
+        """Counters of every (pauta, band) with at least one evaluation"""
+        counters = self.counters
+        for pauta_id in range(1, MAX_PAUTA_ID + 1):
+            for band in range(BANDS):
+                offset = self._offset(pauta_id, band)
+                if counters[offset + EVALUATED]:
+                    yield PautaBandStats(
+                        pauta_id, band, *counters[offset : offset + COUNTERS]
+                    )
+
+    def area_totals(
+        self, repo: Optional[PautasRepository] = None
+    ) -> Dict[Area, PautaBandStats]:
+        """Counters summed over all pautas and bands of each area"""
+        repo = repo or get_shared_repository()
+        totals = {area: [0] * COUNTERS for area in AREAS}
+        for row in self.pauta_bands():
+            pauta = repo.find_by_id(row.pauta_id)
+            if pauta is None:
+                continue
+            area_totals = totals[pauta.area]
+            for index, value in enumerate(row[2:]):
+                area_totals[index] += value
+        return {
+            area: PautaBandStats(0, 0, *values) for area, values in totals.items()
+        }
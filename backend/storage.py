@@ -0,0 +1,399 @@
+"""
+SQLite persistence for children, visits and per-pauta answers.
+
+Ages are stored in integer hundredths of a year and dates as ISO text.
+Each visit keeps its passed / failed / failed A / failed B pautas as four
+16-byte pauta sets in one 64-byte column; the per-pauta answers table adds
+an index by failed pauta and can be turned off to store only the sets.
+Bulk inserts go through executemany in transactions of a configurable size,
+and the database runs in WAL mode so readers are not blocked by ingestion.
+"""
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+from typing import Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from .fixedpoint import from_hundredths, to_hundredths
+from .pautaset import SET_SIZE, PautaSet
+from .scoring import AssessmentResult
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Categoría de una pauta fallada
+CATEGORY_NONE = 0
+CATEGORY_A = 1
+CATEGORY_B = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS children (
+    id INTEGER PRIMARY KEY,
+    external_id TEXT UNIQUE,
+    birth_date TEXT NOT NULL,
+    gestational_age_weeks INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS visits (
+    id INTEGER PRIMARY KEY,
+    child_id INTEGER NOT NULL REFERENCES children (id),
+    survey_date TEXT NOT NULL,
+    chronological_age INTEGER NOT NULL,
+    corrected_age INTEGER NOT NULL,
+    passed_screening INTEGER NOT NULL,
+    norm_version TEXT,
+    answer_sets BLOB,
+    answer_rows INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS answers (
+    visit_id INTEGER NOT NULL REFERENCES visits (id),
+    pauta_id INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    category INTEGER NOT NULL,
+    PRIMARY KEY (visit_id, pauta_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS visits_by_child ON visits (child_id, survey_date);
+CREATE INDEX IF NOT EXISTS visits_by_survey_date ON visits (survey_date);
+CREATE INDEX IF NOT EXISTS failed_answers_by_pauta
+    ON answers (pauta_id, visit_id) WHERE passed = 0;
+"""
+
+# Creado después de _migrate, que agrega la columna answer_rows a bases anteriores
+_INDEX_SETS_ONLY = (
+    "CREATE INDEX IF NOT EXISTS visits_without_answer_rows"
+    " ON visits (id) WHERE answer_rows = 0"
+)
+
+_INSERT_CHILD = (
+    "INSERT INTO children (id, external_id, birth_date, gestational_age_weeks) "
+    "VALUES (?, ?, ?, ?)"
+)
+_INSERT_VISIT = (
+    "INSERT INTO visits (id, child_id, survey_date, chronological_age, "
+    "corrected_age, passed_screening, norm_version, answer_sets, answer_rows) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_ANSWER = (
+    "INSERT INTO answers (visit_id, pauta_id, passed, category) VALUES (?, ?, ?, ?)"
+)
+_SELECT_VISITS = (
+    "SELECT id, child_id, survey_date, chronological_age, corrected_age, "
+    "passed_screening, norm_version FROM visits"
+)
+
+
+class StoredChild(NamedTuple):
+    id: int
+    external_id: Optional[str]
+    birth_date: date
+    gestational_age_weeks: int
+
+
+class StoredVisit(NamedTuple):
+    id: int
+    child_id: int
+    survey_date: date
+    chronological_age: Decimal
+    corrected_age: Decimal
+    passed_screening: bool
+    norm_version: Optional[str]
+
+
+class VisitSets(NamedTuple):
+    """The pauta sets of a stored visit"""
+
+    passed: PautaSet
+    failed: PautaSet
+    failed_a: PautaSet
+    failed_b: PautaSet
+
+    def to_bytes(self) -> bytes:
+        return b"".join(pauta_set.to_bytes() for pauta_set in self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "VisitSets":
+        return cls(
+            *(
+                PautaSet.from_bytes(data[offset : offset + SET_SIZE])
+                for offset in range(0, 4 * SET_SIZE, SET_SIZE)
+            )
+        )
+
+    @classmethod
+    def from_result(cls, result: AssessmentResult) -> "VisitSets":
+        return cls(
+            result.passed_set,
+            result.failed_set,
+            result.failed_a_set,
+            result.failed_b_set,
+        )
+
+
+class VisitRecord(NamedTuple):
+    """A scored visit to store: the child it belongs to and its result"""
+
+    child_id: int
+    survey_date: date
+    result: AssessmentResult
+
+
+def _visit_from_row(row) -> StoredVisit:
+    visit_id, child_id, survey_date, chronological, corrected, passed, version = row
+    return StoredVisit(
+        visit_id,
+        child_id,
+        date.fromisoformat(survey_date),
+        from_hundredths(chronological),
+        from_hundredths(corrected),
+        bool(passed),
+        version,
+    )
+
+
+def _answer_rows(visit_id: int, result: AssessmentResult) -> Iterator[Tuple]:
+    failed_a = set(result.failed_a)
+    failed_b = set(result.failed_b)
+    for pauta_id in result.passed:
+        yield (visit_id, pauta_id, 1, CATEGORY_NONE)
+    for pauta_id in result.failed:
+        if pauta_id in failed_a:
+            category = CATEGORY_A
+        elif pauta_id in failed_b:
+            category = CATEGORY_B
+        else:
+            category = CATEGORY_NONE
+        yield (visit_id, pauta_id, 0, category)
+
+
+def _has_pauta(answer_sets: Optional[bytes], offset: int, pauta_id: int) -> bool:
+    """SQL function: whether the set at offset in an answer_sets value has the pauta"""
+    if answer_sets is None:
+        return False
+    return pauta_id in PautaSet.from_bytes(answer_sets[offset : offset + SET_SIZE])
+
+
+class AssessmentStore:
+    """
+    Stores children, their visits and the answer to each administered pauta.
+
+    Args:
+        path: SQLite database file (":memory:" for a temporary database)
+        batch_size: Rows written per transaction by the bulk insert methods
+        answer_rows: Also write one answers row per administered pauta; without
+            them visits only keep their pauta sets. Each visit is flagged with
+            how it was stored, so later connections still find it in
+            visits_failing whatever their own setting
+    """
+
+    def __init__(
+        self, path: str, batch_size: int = DEFAULT_BATCH_SIZE, answer_rows: bool = True
+    ):
+        self.batch_size = batch_size
+        self.answer_rows = answer_rows
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self.connection.execute(_INDEX_SETS_ONLY)
+        self.connection.create_function(
+            "has_pauta", 3, _has_pauta, deterministic=True
+        )
+
+    def _migrate(self):
+        """Add columns introduced after a database was created"""
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(visits)")
+        }
+        if "norm_version" not in columns:
+            # Las visitas anteriores quedan sin versión de normas (NULL)
+            self.connection.execute("ALTER TABLE visits ADD COLUMN norm_version TEXT")
+        if "answer_sets" not in columns:
+            # Las visitas anteriores conservan sus respuestas en la tabla answers
+            self.connection.execute("ALTER TABLE visits ADD COLUMN answer_sets BLOB")
+        if "answer_rows" not in columns:
+            # Las visitas con conjuntos y sin filas en answers se guardaron sin ellas
+            self.connection.execute(
+                "ALTER TABLE visits ADD COLUMN answer_rows INTEGER NOT NULL DEFAULT 1"
+            )
+            self.connection.execute(
+                "UPDATE visits SET answer_rows = 0 WHERE answer_sets IS NOT NULL"
+                " AND NOT EXISTS (SELECT 1 FROM answers WHERE visit_id = visits.id)"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "AssessmentStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_id(self, table: str) -> int:
+        (last,) = self.connection.execute(
+            f"SELECT COALESCE(MAX(id), 0) FROM {table}"
+        ).fetchone()
+        return last + 1
+
+    def add_child(
+        self,
+        birth_date: date,
+        gestational_age_weeks: int = 40,
+        external_id: Optional[str] = None,
+    ) -> int:
+        """Store a child and return its id"""
+        return self.add_children([(birth_date, gestational_age_weeks, external_id)])[0]
+
+    def add_children(
+        self, children: Iterable[Tuple[date, int, Optional[str]]]
+    ) -> List[int]:
+        """
+        Bulk insert (birth_date, gestational_age_weeks, external_id) tuples.
+
+        Returns:
+            The ids assigned to the children, in input order
+        """
+        ids: List[int] = []
+        iterator = iter(children)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return ids
+            with self._transaction():
+                first = self._next_id("children")
+                rows = [
+                    (first + offset, external_id, birth_date.isoformat(), weeks)
+                    for offset, (birth_date, weeks, external_id) in enumerate(batch)
+                ]
+                self.connection.executemany(_INSERT_CHILD, rows)
+            ids.extend(row[0] for row in rows)
+
+    def add_visit(self, child_id: int, survey_date: date, result: AssessmentResult) -> int:
+        """Store a scored visit with its answers and return its id"""
+        return self.add_visits([VisitRecord(child_id, survey_date, result)])[0]
+
+    def add_visits(self, visits: Iterable[VisitRecord]) -> List[int]:
+        """
+        Bulk insert scored visits and their answers, batch_size visits per
+        transaction.
+
+        Returns:
+            The ids assigned to the visits, in input order
+        """
+        ids: List[int] = []
+        iterator = iter(visits)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return ids
+            with self._transaction():
+                first = self._next_id("visits")
+                visit_rows = []
+                answer_rows = []
+                for offset, (child_id, survey_date, result) in enumerate(batch):
+                    visit_id = first + offset
+                    visit_rows.append(
+                        (
+                            visit_id,
+                            child_id,
+                            survey_date.isoformat(),
+                            to_hundredths(result.chronological_age),
+                            to_hundredths(result.corrected_age),
+                            int(result.passed_screening),
+                            result.norm_version,
+                            VisitSets.from_result(result).to_bytes(),
+                            int(self.answer_rows),
+                        )
+                    )
+                    if self.answer_rows:
+                        answer_rows.extend(_answer_rows(visit_id, result))
+                self.connection.executemany(_INSERT_VISIT, visit_rows)
+                self.connection.executemany(_INSERT_ANSWER, answer_rows)
+            ids.extend(row[0] for row in visit_rows)
+
+    def _transaction(self):
+        return _Transaction(self.connection)
+
+    def get_child(self, child_id: int) -> Optional[StoredChild]:
+        row = self.connection.execute(
+            "SELECT id, external_id, birth_date, gestational_age_weeks "
+            "FROM children WHERE id = ?",
+            (child_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return StoredChild(row[0], row[1], date.fromisoformat(row[2]), row[3])
+
+    def visits_for_child(self, child_id: int) -> List[StoredVisit]:
+        """All visits of a child, oldest first"""
+        rows = self.connection.execute(
+            _SELECT_VISITS + " WHERE child_id = ? ORDER BY survey_date, id",
+            (child_id,),
+        )
+        return [_visit_from_row(row) for row in rows]
+
+    def visits_between(self, start: date, end: date) -> Iterator[StoredVisit]:
+        """Visits with a survey date in [start, end], lazily, by date"""
+        rows = self.connection.execute(
+            _SELECT_VISITS
+            + " WHERE survey_date BETWEEN ? AND ? ORDER BY survey_date, id",
+            (start.isoformat(), end.isoformat()),
+        )
+        return (_visit_from_row(row) for row in rows)
+
+    def visits_failing(self, pauta_id: int) -> Iterator[StoredVisit]:
+        """Visits where the given pauta was failed, lazily"""
+        # Visitas con filas en answers por el índice de fallas; las guardadas
+        # solo con conjuntos, por el índice parcial de answer_rows = 0
+        rows = self.connection.execute(
+            _SELECT_VISITS
+            + " WHERE id IN (SELECT visit_id FROM answers"
+            " WHERE pauta_id = ? AND passed = 0)"
+            " UNION ALL "
+            + _SELECT_VISITS
+            + " WHERE answer_rows = 0 AND has_pauta(answer_sets, ?, ?)"
+            " ORDER BY id",
+            (pauta_id, SET_SIZE, pauta_id),
+        )
+        return (_visit_from_row(row) for row in rows)
+
+    def visit_sets(self, visit_id: int) -> Optional[VisitSets]:
+        """The pauta sets of a visit, or None for visits stored without them"""
+        row = self.connection.execute(
+            "SELECT answer_sets FROM visits WHERE id = ?", (visit_id,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return VisitSets.from_bytes(row[0])
+
+    def answers_for_visit(self, visit_id: int) -> Mapping[int, bool]:
+        """The recorded pass (True) / fail (False) of each pauta of a visit"""
+        rows = self.connection.execute(
+            "SELECT pauta_id, passed FROM answers WHERE visit_id = ? ORDER BY pauta_id",
+            (visit_id,),
+        )
+        answers = {pauta_id: bool(passed) for pauta_id, passed in rows}
+        if not answers:
+            sets = self.visit_sets(visit_id)
+            if sets is not None:
+                answers = dict.fromkeys(sets.passed, True)
+                answers.update(dict.fromkeys(sets.failed, False))
+                answers = dict(sorted(answers.items()))
+        return answers
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from backend.child import Child, calculate_cohort_ages
+from backend.fixedpoint import to_hundredths
+
+BIRTH_DATE = date(2015, 1, 1)
+DAY_COUNTS = range(0, 8 * 366)
+GESTATIONAL_WEEKS = range(22, 43)
+
+
+def decimal_ages(days: int, weeks: int):
+    """Reference Decimal arithmetic the integer-hundredths version replaced"""
+    age = Decimal(days / 365.25).quantize(Decimal("0.01"))
+    if age < 2 and weeks < 37:
+        return age, age - Decimal((40 - weeks) / 52).quantize(Decimal("0.01"))
+    return age, age
+
+
+def test_child_hundredths_match_decimal_arithmetic():
+    for weeks in GESTATIONAL_WEEKS:
+        for days in DAY_COUNTS:
+            child = Child(BIRTH_DATE, BIRTH_DATE + timedelta(days=days), weeks)
+            age, corrected = decimal_ages(days, weeks)
+            assert child.age_hundredths() == to_hundredths(age)
+            assert child.corrected_age_hundredths() == to_hundredths(corrected)
+            assert child.calculate_age() == age
+            assert child.calculate_corrected_age() == corrected
+
+
+def test_cohort_ages_match_child():
+    weeks = list(GESTATIONAL_WEEKS) * (len(DAY_COUNTS) // len(GESTATIONAL_WEEKS))
+    births = [BIRTH_DATE] * len(weeks)
+    surveys = [BIRTH_DATE + timedelta(days=days) for days in DAY_COUNTS][: len(weeks)]
+    chronological, corrected = calculate_cohort_ages(births, surveys, weeks)
+    for index, (survey, week) in enumerate(zip(surveys, weeks)):
+        child = Child(BIRTH_DATE, survey, week)
+        assert chronological[index] == child.calculate_age()
+        assert corrected[index] == child.calculate_corrected_age()
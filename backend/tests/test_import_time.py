@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+# Presupuesto de importación en frío para las invocaciones cortas de la CLI
+IMPORT_BUDGET_US = 150_000
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+def cumulative_import_us(module: str) -> int:
+    """Cumulative import time of a module in a fresh interpreter, from -X importtime"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in completed.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_assessment_import_within_budget():
+    # La mejor de varias corridas, para no depender de la carga de la máquina
+    elapsed = min(cumulative_import_us("backend.assessment") for _ in range(3))
+    assert elapsed <= IMPORT_BUDGET_US, f"import took {elapsed} us"
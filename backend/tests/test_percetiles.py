@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+import pytest
+
+from backend.batch import classify_ages
+from backend.percetiles import PautasRepository
+
+# Edades de 0 a 7 años en pasos de 0,01
+AGES_0_TO_7 = [Decimal(hundredths) / 100 for hundredths in range(0, 701)]
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return PautasRepository()
+
+
+def test_plan_for_age_matches_should_evaluate_loop(repo):
+    for age in AGES_0_TO_7:
+        expected = [pauta for pauta in repo.pautas if pauta.should_evaluate(age)]
+        assert list(repo.plan_for_age(age)) == expected, age
+
+
+def test_hundredths_methods_match_decimal_methods(repo):
+    # Todo el rango de edades, con margen fuera de las ventanas de evaluación
+    for hundredths in range(-200, 1001):
+        age = Decimal(hundredths) / 100
+        for pauta in repo.pautas:
+            assert pauta.is_pauta_a_hundredths(hundredths) == pauta.is_pauta_a(age)
+            assert pauta.is_pauta_b_hundredths(hundredths) == pauta.is_pauta_b(age)
+            assert pauta.should_evaluate_hundredths(
+                hundredths
+            ) == pauta.should_evaluate(age), (pauta.id, age)
+
+
+def test_classify_ages_matches_scalar_methods(repo):
+    # Grilla de centésimos, más edades fuera de la grilla junto a cada límite
+    ages = [Decimal(hundredths) / 100 for hundredths in range(-200, 1001)]
+    for boundary in repo.plan_boundaries + tuple(
+        age for pauta in repo.pautas for age in (pauta.p75, pauta.p90)
+    ):
+        ages.extend((boundary - Decimal("0.001"), boundary + Decimal("0.0001")))
+    ages.extend(Decimal(thousandths) / 1000 for thousandths in range(-5, 7500, 37))
+
+    result = classify_ages(ages, repo)
+    for index, age in enumerate(ages):
+        assert result.row(result.evaluate, index) == bytes(
+            pauta.should_evaluate(age) for pauta in repo.pautas
+        ), age
+        assert result.row(result.category_a, index) == bytes(
+            pauta.is_pauta_a(age) for pauta in repo.pautas
+        ), age
+        assert result.row(result.category_b, index) == bytes(
+            pauta.is_pauta_b(age) for pauta in repo.pautas
+        ), age
@@ -0,0 +1,91 @@
+import pytest
+
+from backend.batch import NOT_ANSWERED, score_trials
+from backend.percetiles import PautasRepository, parse_approval_range
+from backend.scoring import TrialCount, answer_passes, parse_answer
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return PautasRepository()
+
+
+@pytest.fixture(scope="module")
+def multi_trial(repo):
+    return next(pauta for pauta in repo.pautas if pauta.approval.trials == 4)
+
+
+@pytest.fixture(scope="module")
+def single_trial(repo):
+    return next(pauta for pauta in repo.pautas if pauta.approval.trials == 1)
+
+
+def test_trial_total_must_match_the_pauta(multi_trial):
+    assert parse_answer("3/5") == TrialCount(3, 5)
+    with pytest.raises(ValueError):
+        answer_passes(multi_trial, parse_answer("3/5"))
+    with pytest.raises(ValueError):
+        answer_passes(multi_trial, TrialCount(5, 4))
+    required = multi_trial.approval.required
+    assert answer_passes(multi_trial, parse_answer(f"{required}/4"))
+    assert not answer_passes(multi_trial, parse_answer(f"{required - 1}/4"))
+
+
+def test_bare_numbers_only_answer_single_trial_pautas(multi_trial, single_trial):
+    for value in ("1", 1, "0", 0):
+        with pytest.raises(ValueError):
+            answer_passes(multi_trial, parse_answer(value))
+    assert answer_passes(single_trial, parse_answer("1"))
+    assert not answer_passes(single_trial, parse_answer(0))
+    with pytest.raises(ValueError):
+        answer_passes(single_trial, 2)
+    # S/N es el veredicto del evaluador para cualquier pauta
+    assert answer_passes(multi_trial, parse_answer("S"))
+    assert not answer_passes(multi_trial, parse_answer("n"))
+
+
+@pytest.mark.parametrize("text", ["4", "4-2", "0-3", "-2", "2-", "a-b", "2-4-6"])
+def test_invalid_approval_ranges(text):
+    with pytest.raises(ValueError):
+        parse_approval_range(text)
+
+
+def test_approval_ranges():
+    assert parse_approval_range("") == (1, 1)
+    assert parse_approval_range(" 2-4 ") == (2, 4)
+
+
+def test_score_trials_matches_answer_passes(repo):
+    # Una fila por cantidad de intentos logrados, más una sin respuesta
+    most_trials = max(pauta.approval.trials for pauta in repo.pautas)
+    rows = [
+        [
+            successes if successes <= pauta.approval.trials else NOT_ANSWERED
+            for pauta in repo.pautas
+        ]
+        for successes in range(most_trials + 1)
+    ]
+    rows.append([NOT_ANSWERED] * len(repo.pautas))
+    outcomes = score_trials(bytes(value for row in rows for value in row), repo)
+
+    for index, row in enumerate(rows):
+        passed = outcomes.row(outcomes.passed, index)
+        failed = outcomes.row(outcomes.failed, index)
+        for column, (pauta, successes) in enumerate(zip(repo.pautas, row)):
+            if successes == NOT_ANSWERED:
+                assert (passed[column], failed[column]) == (0, 0)
+                continue
+            expected = answer_passes(
+                pauta, TrialCount(successes, pauta.approval.trials)
+            )
+            assert (passed[column], failed[column]) == (expected, not expected), (
+                pauta.id,
+                successes,
+            )
+
+
+def test_score_trials_rejects_counts_above_the_trials(repo, single_trial):
+    counts = bytearray([NOT_ANSWERED] * len(repo.pautas))
+    counts[repo.pautas.index(single_trial)] = 2
+    with pytest.raises(ValueError):
+        score_trials(bytes(counts), repo)
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from backend.child import Child
+from backend.scoring import build_plan, score
+from backend.storage import AssessmentStore
+
+BIRTH_DATE = date(2018, 1, 1)
+SURVEY_DATE = date(2019, 6, 1)
+
+
+@pytest.fixture(scope="module")
+def failed_result():
+    plan = build_plan(Child(BIRTH_DATE, SURVEY_DATE))
+    return score(plan, dict.fromkeys(plan.pauta_ids, False))
+
+
+def test_visits_failing_finds_sets_only_visits_after_reopening(tmp_path, failed_result):
+    path = str(tmp_path / "prunape.db")
+    pauta_id = failed_result.failed[0]
+    with AssessmentStore(path) as store:
+        child_id = store.add_child(BIRTH_DATE)
+        with_rows = store.add_visit(child_id, SURVEY_DATE, failed_result)
+    with AssessmentStore(path, answer_rows=False) as store:
+        sets_only = store.add_visit(child_id, SURVEY_DATE, failed_result)
+
+    # Reabierta con la configuración por defecto, encuentra ambas visitas
+    with AssessmentStore(path) as store:
+        assert [visit.id for visit in store.visits_failing(pauta_id)] == [
+            with_rows,
+            sets_only,
+        ]
+        assert store.answers_for_visit(sets_only) == store.answers_for_visit(with_rows)
+
+
+def test_visits_failing_does_not_scan_visits(tmp_path, failed_result):
+    with AssessmentStore(str(tmp_path / "prunape.db"), answer_rows=False) as store:
+        store.add_visit(store.add_child(BIRTH_DATE), SURVEY_DATE, failed_result)
+        trace = []
+        store.connection.set_trace_callback(trace.append)
+        list(store.visits_failing(failed_result.failed[0]))
+        store.connection.set_trace_callback(None)
+        plan = store.connection.execute("EXPLAIN QUERY PLAN " + trace[-1]).fetchall()
+    details = [row[-1] for row in plan]
+    assert any("visits_without_answer_rows" in detail for detail in details), details
+    for detail in details:
+        if detail.startswith("SCAN") and "visits" in detail:
+            assert "USING INDEX visits_without_answer_rows" in detail, detail
@@ -0,0 +1,82 @@
+import random
+import re
+from datetime import date, timedelta
+
+import pytest
+
+from backend.assessment import run_assessment
+from backend.child import Child
+from backend.percetiles import PautasRepository
+from backend.scoring import build_plan, score
+from backend.verdict import decisive_order, score_until_decided
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return PautasRepository()
+
+
+def _plans(repo, count=400, seed=20190516):
+    rng = random.Random(seed)
+    for _ in range(count):
+        birth_date = date(2015, 1, 1) + timedelta(days=rng.randint(0, 1500))
+        survey_date = birth_date + timedelta(days=rng.randint(10, 2400))
+        yield rng, build_plan(Child(birth_date, survey_date, rng.randint(26, 41)), repo)
+
+
+def test_early_verdict_matches_full_score(repo):
+    for rng, plan in _plans(repo):
+        # Respuestas al azar, con algunas pautas sin responder
+        answers = {
+            pauta_id: rng.random() < 0.8
+            for pauta_id in plan.pauta_ids
+            if rng.random() < 0.9
+        }
+        full = score(plan, answers)
+        early = score_until_decided(plan, answers)
+        assert early.passed_screening == full.passed_screening, answers
+        assert set(early.failed) <= set(full.failed)
+
+
+def test_skipped_answers_are_not_missing(repo):
+    for _, plan in _plans(repo):
+        if plan.category_a:
+            break
+    first_a = next(iter(plan.category_a))
+    unanswered = plan.pauta_ids[-1]
+    answers = {pauta_id: True for pauta_id in plan.pauta_ids if pauta_id != unanswered}
+    answers[first_a] = False
+
+    result = score_until_decided(plan, answers)
+    assert not result.passed_screening
+    assert result.failed_a == (first_a,)
+    assert result.missing == (unanswered,)
+    assert set(result.skipped) == set(answers) - set(result.evaluated)
+    assert set(result.evaluated) | set(result.skipped) | set(result.missing) == set(
+        plan.pauta_ids
+    )
+
+
+def _asked_pautas(monkeypatch, capsys, stop_early):
+    def answer(prompt):
+        # Falla todo: cero intentos logrados o N
+        return "0" if "intentos" in prompt else "N"
+
+    monkeypatch.setattr("builtins.input", answer)
+    run_assessment(stop_early=stop_early)
+    output = capsys.readouterr().out
+    answers = output.split("Ingrese resultados", 1)[1].split("Resultados finales", 1)[0]
+    return [int(pauta_id) for pauta_id in re.findall(r"^Pauta (\d+):", answers, re.M)]
+
+
+def test_plan_order_without_stop_early(monkeypatch, capsys):
+    plan = build_plan(Child(date(2016, 1, 18), date(2019, 5, 16), 38))
+    assert _asked_pautas(monkeypatch, capsys, False) == list(plan.pauta_ids)
+
+
+def test_decisive_order_with_stop_early(monkeypatch, capsys):
+    plan = build_plan(Child(date(2016, 1, 18), date(2019, 5, 16), 38))
+    order = [item.pauta.id for item in decisive_order(plan.items)]
+    asked = _asked_pautas(monkeypatch, capsys, True)
+    assert asked == order[: len(asked)]
+    assert len(asked) < len(order)
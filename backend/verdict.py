@@ -0,0 +1,146 @@
+"""
+Short-circuit PRUNAPE verdict engine.
+
+Under PRUNAPE rules a single failed category-A pauta, or two failed
+category-B pautas, fail the screening; pautas that are neither A nor B never
+change the verdict. The engine administers A items first, then B items, then
+the rest, updates the verdict after each answer and reports as soon as the
+remaining items can no longer change it.
+"""
+
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .percetiles import PlanItem
+from .scoring import (
+    FAILED_A_LIMIT,
+    FAILED_B_LIMIT,
+    Answer,
+    AssessmentPlan,
+    AssessmentResult,
+    answer_passes,
+    score,
+)
+
+
+def decisive_order(items: Tuple[PlanItem, ...]) -> Tuple[PlanItem, ...]:
+    """Plan items with category A first, then category B, then the rest"""
+    return (
+        tuple(item for item in items if item.is_a)
+        + tuple(item for item in items if item.is_b and not item.is_a)
+        + tuple(item for item in items if not item.is_a and not item.is_b)
+    )
+
+
+class VerdictEngine:
+    """
+    Tracks the verdict of an assessment while its answers come in.
+
+    Args:
+        plan: Plan built with scoring.build_plan
+    """
+
+    def __init__(self, plan: AssessmentPlan):
+        self.plan = plan
+        self.order = decisive_order(plan.items)
+        self.answers: Dict[int, Answer] = {}
+        self._position = 0
+        self._failed_a = 0
+        self._failed_b = 0
+        self._remaining_a = sum(1 for item in plan.items if item.is_a)
+        self._remaining_b = sum(
+            1 for item in plan.items if item.is_b and not item.is_a
+        )
+        self._items = {item.pauta.id: item for item in plan.items}
+
+    @property
+    def verdict(self) -> Optional[bool]:
+        """True (passes), False (fails) or None while the outcome is open"""
+        if self._failed_a >= FAILED_A_LIMIT or self._failed_b >= FAILED_B_LIMIT:
+            return False
+        if (
+            self._failed_a + self._remaining_a < FAILED_A_LIMIT
+            and self._failed_b + self._remaining_b < FAILED_B_LIMIT
+        ):
+            return True
+        return None
+
+    @property
+    def is_decided(self) -> bool:
+        """Whether no remaining answer can change the verdict"""
+        return self.verdict is not None
+
+    def next_item(self) -> Optional[PlanItem]:
+        """The next unanswered item in decisive order, or None when all are answered"""
+        while self._position < len(self.order):
+            item = self.order[self._position]
+            if item.pauta.id not in self.answers:
+                return item
+            self._position += 1
+        return None
+
+    def record(self, pauta_id: int, answer: Answer) -> Optional[bool]:
+        """
+        Record the answer for a pauta of the plan, pass/fail or a TrialCount
+        (see answer_passes), and return the updated verdict.
+
+        Raises:
+            ValueError: If the pauta is not in the plan, was already answered
+                or the answer is not valid for it
+        """
+        item = self._items.get(pauta_id)
+        if item is None:
+            raise ValueError(f"Pauta {pauta_id} is not in the plan")
+        if pauta_id in self.answers:
+            raise ValueError(f"Pauta {pauta_id} was already answered")
+        passed = answer_passes(item.pauta, answer)
+        self.answers[pauta_id] = answer
+        if item.is_a:
+            self._remaining_a -= 1
+            if not passed:
+                self._failed_a += 1
+        elif item.is_b:
+            self._remaining_b -= 1
+            if not passed:
+                self._failed_b += 1
+        return self.verdict
+
+    def pending(self) -> List[PlanItem]:
+        """Items not answered yet, in decisive order"""
+        return [item for item in self.order if item.pauta.id not in self.answers]
+
+    def result(self) -> AssessmentResult:
+        """Score the answers recorded so far; unanswered items are reported as missing"""
+        return score(self.plan, self.answers)
+
+
+def score_until_decided(
+    plan: AssessmentPlan, answers: Mapping[int, Answer]
+) -> AssessmentResult:
+    """
+    Score recorded answers in decisive order, stopping as soon as the verdict
+    is decided. Recorded answers after that point are not read: their pautas
+    are reported in skipped, while missing keeps only the pautas of the plan
+    without a recorded answer.
+    """
+    engine = VerdictEngine(plan)
+    for item in engine.order:
+        if engine.is_decided:
+            break
+        answer = answers.get(item.pauta.id)
+        if answer is not None:
+            engine.record(item.pauta.id, answer)
+    result = engine.result()
+    skipped = tuple(
+        pauta_id
+        for pauta_id in result.missing
+        if answers.get(pauta_id) is not None
+    )
+    if not skipped:
+        return result
+    skipped_ids = set(skipped)
+    return result._replace(
+        missing=tuple(
+            pauta_id for pauta_id in result.missing if pauta_id not in skipped_ids
+        ),
+        skipped=skipped,
+    )